@@ -0,0 +1,144 @@
+"""Benchmark bộ giải Euler CSR (`konigsberg.euler`) so với networkx trên đa đồ thị ngẫu nhiên.
+
+Mỗi kích thước sinh một đa đồ thị liên thông có chu trình (hoặc đường đi) Euler: một đường đi qua
+mọi đỉnh theo thứ tự ngẫu nhiên, các cạnh ngẫu nhiên (có cả cạnh song song), rồi ghép các đỉnh bậc lẻ
+thành cặp để sửa chẵn lẻ. Đo thời gian và bộ nhớ đỉnh (tracemalloc) của từng bộ giải, kiểm tra kết quả:
+
+    python benchmarks/euler_bench.py                              # 1e3 .. 1e6 cạnh
+    python benchmarks/euler_bench.py --edges 2000000 --nx-max-edges 0
+    python benchmarks/euler_bench.py --path --json euler.json
+
+networkx chỉ chạy tới `--nx-max-edges` cạnh (mặc định 200000) vì chậm và tốn bộ nhớ ở kích thước lớn.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Thêm thư mục src vào sys.path giống run.py
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PATH = os.path.join(os.path.dirname(BENCH_DIR), "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from konigsberg import euler  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+# --- Sinh đồ thị ----------------------------------------------------------------
+def random_eulerian_multigraph(edge_count: int, seed: int = 0, path: bool = False) -> Tuple[int, np.ndarray, np.ndarray]:
+    """Đa đồ thị liên thông ngẫu nhiên có khoảng `edge_count` cạnh; có chu trình Euler (hoặc đường đi nếu `path`)."""
+    rng = np.random.default_rng(seed)
+    node_count = max(2, edge_count // 4)
+    order = rng.permutation(node_count)
+    # Đường đi qua mọi đỉnh bảo đảm liên thông
+    us = [order[:-1]]
+    vs = [order[1:]]
+    extra = max(0, edge_count - (node_count - 1) - node_count // 2)
+    us.append(rng.integers(0, node_count, extra))
+    vs.append(rng.integers(0, node_count, extra))
+    us_all, vs_all = np.concatenate(us), np.concatenate(vs)
+
+    degrees = np.bincount(us_all, minlength=node_count) + np.bincount(vs_all, minlength=node_count)
+    odd = rng.permutation(np.flatnonzero(degrees & 1))
+    if path:
+        odd = odd[2:]  # giữ lại đúng hai đỉnh bậc lẻ
+    us_all = np.concatenate((us_all, odd[0::2]))
+    vs_all = np.concatenate((vs_all, odd[1::2]))
+    return node_count, us_all, vs_all
+
+
+# --- Bộ giải ------------------------------------------------------------------
+def solve_csr(node_count: int, us: np.ndarray, vs: np.ndarray) -> List[int]:
+    graph = euler.build_csr(node_count, us, vs)
+    return list(euler.euler_walk(graph))
+
+
+def solve_networkx(node_count: int, us: np.ndarray, vs: np.ndarray) -> List[int]:
+    import networkx as nx
+
+    graph = nx.MultiGraph()
+    graph.add_nodes_from(range(node_count))
+    graph.add_edges_from(zip(us.tolist(), vs.tolist()))
+    if nx.is_eulerian(graph):
+        edges = list(nx.eulerian_circuit(graph))
+        return [edge[0] for edge in edges] + [edges[0][0]]
+    edges = list(nx.eulerian_path(graph))
+    return [edge[0] for edge in edges] + [edges[-1][1]]
+
+
+SOLVERS: Dict[str, Callable[[int, np.ndarray, np.ndarray], List[int]]] = {
+    "csr": solve_csr,
+    "networkx": solve_networkx,
+}
+
+
+def is_valid_walk(walk: List[int], node_count: int, us: np.ndarray, vs: np.ndarray) -> bool:
+    """Dãy đỉnh có đi qua mỗi cạnh đúng một lần không (so sánh đa tập cạnh đã chuẩn hóa)."""
+    if len(walk) != len(us) + 1:
+        return False
+    steps = np.asarray(walk, dtype=np.int64)
+
+    def edge_keys(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.sort(np.minimum(a, b) * node_count + np.maximum(a, b))
+
+    return bool(np.array_equal(edge_keys(steps[:-1], steps[1:]), edge_keys(us, vs)))
+
+
+# --- Đo -----------------------------------------------------------------------
+def measure(solver: Callable[[int, np.ndarray, np.ndarray], List[int]], node_count: int, us: np.ndarray, vs: np.ndarray) -> Dict[str, float]:
+    start = perf_counter()
+    walk = solver(node_count, us, vs)
+    seconds = perf_counter() - start
+
+    # Lần chạy thứ hai dưới tracemalloc để đo bộ nhớ đỉnh (tracemalloc làm chậm nên không tính giờ)
+    tracemalloc.start()
+    solver(node_count, us, vs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 4),
+        "peak_mib": round(peak / (1 << 20), 2),
+        "valid": is_valid_walk(walk, node_count, us, vs),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="So sánh bộ giải Euler CSR với networkx trên đa đồ thị ngẫu nhiên.")
+    parser.add_argument("--edges", type=int, action="append", help="Số cạnh (lặp lại được; mặc định 1e3..1e6).")
+    parser.add_argument("--nx-max-edges", type=int, default=200_000, help="Chỉ chạy networkx tới số cạnh này (0 = bỏ qua).")
+    parser.add_argument("--path", action="store_true", help="Sinh đồ thị có đường đi Euler thay vì chu trình.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Ghi kết quả ra tệp JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    results: List[Dict[str, object]] = []
+    print(f"{'edges':>10} {'solver':<9} {'seconds':>9} {'peak MiB':>9}  valid")
+    for size in args.edges or DEFAULT_SIZES:
+        node_count, us, vs = random_eulerian_multigraph(size, seed=args.seed, path=args.path)
+        for name, solver in SOLVERS.items():
+            if name == "networkx" and len(us) > args.nx_max_edges:
+                continue
+            row = measure(solver, node_count, us, vs)
+            results.append({"edges": int(len(us)), "nodes": node_count, "solver": name, **row})
+            print(f"{len(us):>10} {name:<9} {row['seconds']:>9.3f} {row['peak_mib']:>9.1f}  {row['valid']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, ensure_ascii=False, indent=2)
+    return 0 if all(row["valid"] for row in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""Benchmark vẽ giao diện không cần màn hình (SDL dummy driver).
+
+Chạy `App`/`MainScreen` thật qua các kịch bản dựng sẵn, đo FPS và bộ nhớ cấp phát mỗi frame,
+rồi so sánh với tệp baseline theo ngưỡng dung sai để bắt lỗi hiệu năng vẽ trước khi phát hành:
+
+    python benchmarks/render_bench.py                      # chạy và so sánh với baseline.json
+    python benchmarks/render_bench.py --update-baseline    # ghi kết quả hiện tại làm baseline
+    python benchmarks/render_bench.py --scenario drag --frames 600
+
+Mã thoát 1 nếu có kịch bản vượt ngưỡng. FPS phụ thuộc máy, nên baseline cần được ghi trên
+chính loại máy dùng để so sánh (ví dụ máy kiosk hoặc máy CI cố định).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+import tracemalloc
+from itertools import combinations
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Thêm thư mục src vào sys.path giống run.py
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PATH = os.path.join(os.path.dirname(BENCH_DIR), "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+import pygame  # noqa: E402
+
+from konigsberg.app import App  # noqa: E402
+from konigsberg.profiler import percentile  # noqa: E402
+from konigsberg.screens.sub_screen import SubScreen  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# Ngưỡng mặc định: FPS được phép giảm 25%, bộ nhớ đỉnh mỗi frame tăng 25%,
+# số block còn giữ lại sau mỗi frame tăng tối đa 1 (lớn hơn nghĩa là có rò rỉ/cache không giới hạn)
+DEFAULT_TOLERANCES = {"fps": 0.25, "peak_kib": 0.25, "retained_blocks": 1.0}
+
+
+# --- Kịch bản -------------------------------------------------------------------
+class Scenario:
+    """Một kịch bản benchmark: `setup` dựng trạng thái ban đầu, `step` chạy trước mỗi frame."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        setup: Callable[[App], None],
+        step: Optional[Callable[[App, int], None]] = None,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.step = step or _repaint
+
+
+def _sub_screen(app: App) -> SubScreen:
+    return app.active_screen.sub_screen
+
+
+def _repaint(app: App, frame: int) -> None:  # noqa: ARG001
+    # Cảnh tĩnh: ép vẽ lại và đẩy toàn màn hình (trường hợp xấu nhất, như khi cửa sổ bị che/hiện lại)
+    app.active_screen.invalidate()
+
+
+def _setup_empty(app: App) -> None:  # noqa: ARG001
+    pass
+
+
+def _setup_legal_bridges(app: App) -> None:
+    """Xây đủ 19 cầu hợp lệ của bản đồ."""
+    sub = _sub_screen(app)
+    anchor_manager = sub.konigsberg_map.anchor_manager
+    for start_id, end_id in sorted(sub._partner_table().pairs()):
+        sub._add_bridge(anchor_manager.get_anchor_by_id(start_id), anchor_manager.get_anchor_by_id(end_id))
+
+
+def _setup_drag(app: App) -> None:
+    """Nhấn chuột trên một điểm neo của Kneiphof để bắt đầu kéo (các điểm đích được highlight)."""
+    _setup_legal_bridges(app)
+    sub = _sub_screen(app)
+    anchor = sub.konigsberg_map.anchor_manager.get_anchors_by_region("kneiphof")[0]
+    sub.last_click_time = -sub.double_click_threshold  # không bị coi là double click
+    app._dispatch(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(anchor.x, anchor.y)))
+    assert sub.dragging, "Không bắt đầu kéo được từ điểm neo"
+
+
+def _step_drag(app: App, frame: int) -> None:
+    """Di chuột theo vòng tròn quanh điểm neo đang kéo (chỉ các vùng thay đổi được đẩy lên)."""
+    anchor = _sub_screen(app).start_anchor
+    angle = frame * 0.05
+    position = (int(anchor.x + 150 * math.cos(angle)), int(anchor.y + 150 * math.sin(angle)))
+    app._dispatch(pygame.event.Event(pygame.MOUSEMOTION, pos=position, rel=(0, 0), buttons=(1, 0, 0)))
+
+
+def _setup_dense(app: App, bridge_count: int = 300) -> None:
+    """Đa đồ thị dày tổng hợp: nối mọi cặp điểm neo khác vùng (bỏ qua quy tắc nối) cho tới đủ số cầu."""
+    sub = _sub_screen(app)
+    anchors = sub.konigsberg_map.anchor_manager.anchors
+    added = 0
+    for start, end in combinations(anchors, 2):
+        if added >= bridge_count:
+            break
+        if start.region != end.region and sub._add_bridge(start, end) is not None:
+            added += 1
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("empty", "Bản đồ trống, chưa có cầu", _setup_empty),
+        Scenario("legal_bridges", "Đủ 19 cầu hợp lệ", _setup_legal_bridges),
+        Scenario("drag", "Đang kéo cầu, các điểm đích được highlight", _setup_drag, _step_drag),
+        Scenario("dense", "Đa đồ thị dày tổng hợp (300 cầu)", _setup_dense),
+    )
+}
+
+
+# --- Đo ---------------------------------------------------------------------------
+def _frame(app: App, scenario: Scenario, frame: int) -> None:
+    scenario.step(app, frame)
+    app._render_frame()
+
+
+def run_scenario(scenario: Scenario, frames: int, warmup: int) -> Dict[str, float]:
+    """Chạy một kịch bản trên một App mới; trả về FPS, thời gian frame và bộ nhớ cấp phát."""
+    with App() as app:
+        app._render_frame()  # frame đầu tiên dựng bố cục (điểm neo, node đồ thị)
+        scenario.setup(app)
+        for frame in range(warmup):
+            _frame(app, scenario, frame)
+
+        # Lượt 1: thời gian (không bật tracemalloc vì nó làm chậm mọi lần cấp phát)
+        times: List[float] = []
+        for frame in range(warmup, warmup + frames):
+            start = perf_counter()
+            _frame(app, scenario, frame)
+            times.append((perf_counter() - start) * 1000.0)
+
+        # Lượt 2: bộ nhớ. Bộ nhớ đỉnh trong frame (so với đầu frame) và số block còn giữ lại sau frame
+        tracemalloc.start()
+        try:
+            peak_bytes = 0
+            blocks_before = sys.getallocatedblocks()
+            for frame in range(warmup + frames, warmup + 2 * frames):
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                _frame(app, scenario, frame)
+                peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1] - current)
+            retained_blocks = (sys.getallocatedblocks() - blocks_before) / frames
+        finally:
+            tracemalloc.stop()
+
+    times.sort()
+    return {
+        "fps": 1000.0 * len(times) / sum(times),
+        "p50_ms": percentile(times, 0.50),
+        "p95_ms": percentile(times, 0.95),
+        "peak_kib": peak_bytes / 1024.0,
+        "retained_blocks": retained_blocks,
+    }
+
+
+# --- So sánh với baseline ---------------------------------------------------------------
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerances: Dict[str, float]) -> List[str]:
+    """Danh sách các vi phạm ngưỡng (rỗng nếu không có hồi quy)."""
+    failures: List[str] = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["fps"] < expected["fps"] * (1.0 - tolerances["fps"]):
+            failures.append(f"{name}: FPS {result['fps']:.1f} < {expected['fps']:.1f} - {tolerances['fps']:.0%}")
+        # Bộ nhớ đỉnh nhỏ dao động nhiều; cho phép thêm 16 KiB tuyệt đối
+        limit = expected["peak_kib"] * (1.0 + tolerances["peak_kib"]) + 16.0
+        if result["peak_kib"] > limit:
+            failures.append(f"{name}: bộ nhớ đỉnh/frame {result['peak_kib']:.1f} KiB > {limit:.1f} KiB")
+        limit = expected["retained_blocks"] + tolerances["retained_blocks"]
+        if result["retained_blocks"] > limit:
+            failures.append(f"{name}: block giữ lại/frame {result['retained_blocks']:.2f} > {limit:.2f}")
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark vẽ giao diện Königsberg (không cần màn hình).")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Chỉ chạy kịch bản này (lặp lại được).")
+    parser.add_argument("--frames", type=int, default=300, help="Số frame đo mỗi kịch bản.")
+    parser.add_argument("--warmup", type=int, default=30, help="Số frame chạy trước khi đo.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Tệp baseline JSON.")
+    parser.add_argument("--update-baseline", action="store_true", help="Ghi kết quả hiện tại vào tệp baseline.")
+    parser.add_argument("--fps-tolerance", type=float, default=DEFAULT_TOLERANCES["fps"], help="Tỉ lệ FPS được phép giảm.")
+    parser.add_argument("--memory-tolerance", type=float, default=DEFAULT_TOLERANCES["peak_kib"], help="Tỉ lệ bộ nhớ đỉnh được phép tăng.")
+    parser.add_argument("--json", metavar="PATH", help="Ghi kết quả ra tệp JSON.")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    names = args.scenario or list(SCENARIOS)
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'scenario':<15}{'fps':>9}{'p50 ms':>9}{'p95 ms':>9}{'peak KiB':>10}{'blocks':>8}")
+    for name in names:
+        result = run_scenario(SCENARIOS[name], args.frames, args.warmup)
+        results[name] = result
+        print(
+            f"{name:<15}{result['fps']:>9.1f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+            f"{result['peak_kib']:>10.1f}{result['retained_blocks']:>8.2f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as handle:
+                baseline = json.load(handle)
+        baseline.update({name: {key: round(value, 3) for key, value in result.items()} for name, result in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2)
+            handle.write("\n")
+        print(f"Đã ghi baseline: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Chưa có baseline ({args.baseline}); chạy với --update-baseline để tạo.")
+        return 0
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    tolerances = dict(DEFAULT_TOLERANCES, fps=args.fps_tolerance, peak_kib=args.memory_tolerance)
+    failures = compare(results, baseline, tolerances)
+    for failure in failures:
+        print(f"HỒI QUY: {failure}")
+    if not failures:
+        print("Không có hồi quy so với baseline.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
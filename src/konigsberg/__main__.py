@@ -1,16 +1,16 @@
-from .app import App
+from .startup import startup_trace  # nạp đầu tiên: mốc thời gian của đo khởi động
+
+with startup_trace.phase("import"):
+    from .cli import main as cli_main
 
 
 def main() -> None:
     """Điểm vào chương trình khi chạy bằng `python -m konigsberg`.
 
-    Quản lý vòng đời Pygame bằng context manager để đảm bảo giải phóng tài nguyên.
+    Không có tham số: mở giao diện Pygame. `python -m konigsberg analyze ...`: phân tích hàng loạt không mở cửa sổ.
     """
-    with App() as app:
-        app.run()
+    raise SystemExit(cli_main())
 
 
 if __name__ == "__main__":
     main()
-
-
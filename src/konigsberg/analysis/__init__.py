@@ -0,0 +1,5 @@
+from .engine import EulerEngine
+from .bridge_store import BridgeStore
+from .memo import AnalysisMemo
+
+__all__ = ["EulerEngine", "BridgeStore", "AnalysisMemo"]
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from . import engine as euler
+from . import rules
+from .bridge_store import pair_key
+from .config_table import ConfigTable, get_table
+from .engine import EulerEngine
+
+Line = Tuple[int, str]  # (số dòng, nội dung)
+
+
+def analyze_configuration(pairs: Any, include_path: bool = True) -> Dict[str, Any]:
+    """Phân tích một cấu hình cầu (danh sách cặp ID điểm neo) mà không cần giao diện.
+
+    Áp dụng cùng quy tắc với giao diện: điểm neo phải tồn tại, hai điểm neo thuộc hai vùng khác nhau,
+    cặp phải được phép nối và mỗi cặp điểm neo chỉ có tối đa một cầu.
+    """
+    if not isinstance(pairs, list):
+        return {"ok": False, "errors": ["Mỗi dòng phải là một danh sách các cặp điểm neo."]}
+
+    partners = rules.default_partner_table()
+    errors: List[str] = []
+    seen = set()
+    edges: List[Tuple[str, str]] = []
+    for position, pair in enumerate(pairs):
+        if not (isinstance(pair, list) and len(pair) == 2 and all(isinstance(item, str) for item in pair)):
+            errors.append(f"Cầu #{position}: phải là cặp [id_điểm_neo, id_điểm_neo].")
+            continue
+        start_id, end_id = pair
+        try:
+            start_region, _ = rules.parse_anchor_id(start_id)
+            end_region, _ = rules.parse_anchor_id(end_id)
+        except ValueError as exc:
+            errors.append(f"Cầu #{position}: {exc}")
+            continue
+        if not partners.is_valid(start_id, end_id):
+            errors.append(f"Cầu #{position}: không được phép nối {start_id} với {end_id}.")
+            continue
+        key = pair_key(start_id, end_id)
+        if key in seen:
+            errors.append(f"Cầu #{position}: cặp {start_id}-{end_id} đã có cầu.")
+            continue
+        seen.add(key)
+        edges.append((rules.REGION_TO_NODE_ID[start_region], rules.REGION_TO_NODE_ID[end_region]))
+
+    if errors:
+        return {"ok": False, "errors": errors}
+
+    # Kết luận được tra trong bảng tính sẵn mọi cấu hình; chỉ dựng đồ thị khi cần đường đi
+    verdict, connected, odd_nodes = get_table().lookup(ConfigTable.mask_of(seen))
+    degrees = {node: 0 for node in rules.NODE_IDS}
+    for u, v in edges:
+        degrees[u] += 1
+        degrees[v] += 1
+    result: Dict[str, Any] = {
+        "ok": True,
+        "verdict": verdict,
+        "degrees": degrees,
+        "odd": odd_nodes,
+        "connected": connected,
+    }
+    if include_path and verdict in (euler.CIRCUIT, euler.PATH):
+        engine = EulerEngine(rules.NODE_IDS)
+        for u, v in edges:
+            engine.add_edge(u, v)
+        result["path"] = engine.walk()
+    return result
+
+
+def analyze_line(number: int, text: str, include_path: bool = True) -> Dict[str, Any]:
+    """Phân tích một dòng JSON; lỗi cú pháp được trả về như một kết quả không hợp lệ."""
+    try:
+        pairs = json.loads(text)
+    except json.JSONDecodeError as exc:
+        result: Dict[str, Any] = {"ok": False, "errors": [f"JSON không hợp lệ: {exc.msg}"]}
+    else:
+        result = analyze_configuration(pairs, include_path)
+    return {"line": number, **result}
+
+
+def _analyze_chunk(chunk: List[Line], include_path: bool) -> List[str]:
+    """Phân tích một khối dòng (chạy trong tiến trình con) và trả về các dòng JSON đã mã hóa."""
+    return [
+        json.dumps(analyze_line(number, text, include_path), ensure_ascii=False)
+        for number, text in chunk
+    ]
+
+
+def _chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[Line]]:
+    """Gom các dòng không rỗng thành từng khối, giữ lại số dòng gốc (bắt đầu từ 1)."""
+    chunk: List[Line] = []
+    for number, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        chunk.append((number, text))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_results(
+    lines: Iterable[str],
+    workers: int = 1,
+    chunk_size: int = 512,
+    include_path: bool = True,
+) -> Iterator[str]:
+    """Phân tích luồng JSON Lines và sinh ra từng dòng kết quả theo đúng thứ tự đầu vào.
+
+    Với `workers > 1`, các khối được chia cho một process pool; số khối đang xử lý bị giới hạn
+    ở `2 * workers` nên bộ nhớ không phụ thuộc kích thước đầu vào.
+    """
+    if workers > 1:
+        # Tạo bảng phân loại (nếu chưa có) một lần trước khi các tiến trình con ánh xạ nó; không ghi được
+        # tệp bảng thì phân tích tuần tự thay vì để mỗi tiến trình con tự tính lại bảng
+        table = get_table()
+        table.build()
+        if table.in_memory:
+            workers = 1
+    if workers <= 1:
+        for chunk in _chunks(lines, chunk_size):
+            yield from _analyze_chunk(chunk, include_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(pool.submit(_analyze_chunk, chunk, include_path))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
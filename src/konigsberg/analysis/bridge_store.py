@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterator, List, Sequence, Tuple
+
+if TYPE_CHECKING:  # chỉ dùng cho chú thích kiểu, tránh kéo pygame vào phần phân tích
+    from ..graphics.bridge_anchor import BridgeAnchor
+
+
+def pair_key(start_id: str, end_id: str) -> Tuple[str, str]:
+    """Khóa chuẩn (không phụ thuộc chiều) của một cặp điểm neo."""
+    return (start_id, end_id) if start_id <= end_id else (end_id, start_id)
+
+
+class BridgeStore:
+    """Kho cầu duy nhất: vừa là danh sách cầu để vẽ, vừa là đa đồ thị giữa các đỉnh.
+
+    - Mỗi cầu có ID nguyên ổn định trong suốt thời gian tồn tại (slot được tái sử dụng sau khi xóa).
+    - Thuộc tính của cầu nằm trong các mảng song song theo slot (điểm neo đầu/cuối, đỉnh u/v).
+    - Ma trận số cạnh `counts[u][v]` giữa các đỉnh được cập nhật cùng lúc với danh sách cầu,
+      nên đồ thị và các cầu đã vẽ luôn khớp nhau.
+    - Tra cứu theo cặp điểm neo là O(1); không cho phép hai cầu trên cùng một cặp điểm neo.
+    """
+
+    def __init__(self, node_ids: Sequence[str]) -> None:
+        self.node_ids: List[str] = list(node_ids)
+        self.node_index: Dict[str, int] = {node: i for i, node in enumerate(self.node_ids)}
+        size = len(self.node_ids)
+        self.counts: List[array] = [array("I", bytes(4 * size)) for _ in range(size)]
+
+        # Mảng thuộc tính theo slot
+        self._starts: List[BridgeAnchor | None] = []
+        self._ends: List[BridgeAnchor | None] = []
+        self._u = array("i")
+        self._v = array("i")
+        self._free: List[int] = []
+
+        # ID cầu còn sống theo thứ tự thêm vào, và chỉ mục theo cặp điểm neo
+        self._live: Dict[int, None] = {}
+        self._by_pair: Dict[Tuple[str, str], int] = {}
+
+        # Tăng sau mỗi lần thay đổi, dùng để các cache biết khi nào cần làm mới
+        self.version = 0
+        self._count_key: Tuple[Tuple[int, int, int], ...] = ()
+        self._count_key_version = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __iter__(self) -> Iterator[Tuple[BridgeAnchor, BridgeAnchor]]:
+        """Duyệt các cầu dưới dạng cặp (điểm neo đầu, điểm neo cuối) theo thứ tự thêm vào."""
+        for bridge_id in self._live:
+            yield self._starts[bridge_id], self._ends[bridge_id]
+
+    def ids(self) -> List[int]:
+        """ID của các cầu đang tồn tại, theo thứ tự thêm vào."""
+        return list(self._live)
+
+    # --- Thêm/xóa --------------------------------------------------------------
+    def add(self, start: BridgeAnchor, end: BridgeAnchor, u: str, v: str) -> int | None:
+        """Thêm cầu nối hai điểm neo (thuộc đỉnh u và v); trả về None nếu cặp điểm neo đã có cầu."""
+        key = pair_key(start.id, end.id)
+        if key in self._by_pair:
+            return None
+
+        ui, vi = self.node_index[u], self.node_index[v]
+        if self._free:
+            bridge_id = self._free.pop()
+            self._starts[bridge_id] = start
+            self._ends[bridge_id] = end
+            self._u[bridge_id] = ui
+            self._v[bridge_id] = vi
+        else:
+            bridge_id = len(self._starts)
+            self._starts.append(start)
+            self._ends.append(end)
+            self._u.append(ui)
+            self._v.append(vi)
+
+        self._live[bridge_id] = None
+        self._by_pair[key] = bridge_id
+        self.counts[ui][vi] += 1
+        if ui != vi:
+            self.counts[vi][ui] += 1
+        self.version += 1
+        return bridge_id
+
+    def remove(self, bridge_id: int) -> bool:
+        """Xóa đúng cầu có ID cho trước; trả về False nếu ID không tồn tại."""
+        if bridge_id not in self._live:
+            return False
+        start, end = self._starts[bridge_id], self._ends[bridge_id]
+        ui, vi = self._u[bridge_id], self._v[bridge_id]
+
+        del self._live[bridge_id]
+        del self._by_pair[pair_key(start.id, end.id)]
+        self.counts[ui][vi] -= 1
+        if ui != vi:
+            self.counts[vi][ui] -= 1
+        self._starts[bridge_id] = None
+        self._ends[bridge_id] = None
+        self._free.append(bridge_id)
+        self.version += 1
+        return True
+
+    def clear(self) -> None:
+        """Xóa tất cả các cầu."""
+        for bridge_id in list(self._live):
+            self.remove(bridge_id)
+
+    # --- Truy vấn --------------------------------------------------------------
+    def find(self, start_id: str, end_id: str) -> int | None:
+        """ID của cầu nối hai điểm neo (không phân biệt chiều), hoặc None."""
+        return self._by_pair.get(pair_key(start_id, end_id))
+
+    def get(self, bridge_id: int) -> Tuple[BridgeAnchor, BridgeAnchor]:
+        """Cặp điểm neo của cầu."""
+        if bridge_id not in self._live:
+            raise KeyError(bridge_id)
+        return self._starts[bridge_id], self._ends[bridge_id]
+
+    def nodes_of(self, bridge_id: int) -> Tuple[str, str]:
+        """Hai đỉnh đồ thị mà cầu nối."""
+        if bridge_id not in self._live:
+            raise KeyError(bridge_id)
+        return self.node_ids[self._u[bridge_id]], self.node_ids[self._v[bridge_id]]
+
+    def edge_count(self, u: str, v: str) -> int:
+        """Số cạnh song song giữa hai đỉnh."""
+        return self.counts[self.node_index[u]][self.node_index[v]]
+
+    def count_key(self) -> Tuple[Tuple[int, int, int], ...]:
+        """Vector số cạnh chuẩn của đa đồ thị: các bộ (i, j, số cạnh) với i <= j và số cạnh > 0.
+
+        Hai trạng thái có cùng tập cạnh (không phụ thuộc thứ tự thêm hay ID cầu) cho cùng một khóa.
+        """
+        if self._count_key_version != self.version:
+            self._count_key = tuple(
+                (i, j, row[j]) for i, row in enumerate(self.counts) for j in range(i, len(row)) if row[j]
+            )
+            self._count_key_version = self.version
+        return self._count_key
+
+    def pairs(self) -> Iterator[Tuple[str, str, int]]:
+        """Duyệt các cặp đỉnh (u, v, số cạnh) có ít nhất một cạnh, mỗi cặp một lần."""
+        for i, row in enumerate(self.counts):
+            for j in range(i, len(row)):
+                if row[j]:
+                    yield self.node_ids[i], self.node_ids[j], row[j]
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from . import engine as euler
+from . import rules
+from .bridge_store import pair_key
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# 19 cầu hợp lệ của bản đồ Königsberg; cầu thứ i tương ứng với bit i của mặt nạ cấu hình.
+# Giống analysis.rules, hai hằng số này chỉ được tính (nạp bản đồ) ở lần truy cập đầu tiên.
+LEGAL_BRIDGES: Tuple[Tuple[str, str], ...]
+BRIDGE_BITS: Dict[Tuple[str, str], int]
+
+_BRIDGES: Dict[str, object] = {}
+
+
+def _bridges() -> Dict[str, object]:
+    if not _BRIDGES:
+        legal = tuple(sorted(rules.default_partner_table().pairs()))
+        _BRIDGES.update(LEGAL_BRIDGES=legal, BRIDGE_BITS={pair: bit for bit, pair in enumerate(legal)})
+    return _BRIDGES
+
+
+def _legal_bridges() -> Tuple[Tuple[str, str], ...]:
+    """Mọi cặp điểm neo được phép nối (theo thứ tự khóa chuẩn)."""
+    return _bridges()["LEGAL_BRIDGES"]  # type: ignore[return-value]
+
+
+def _bridge_bits() -> Dict[Tuple[str, str], int]:
+    """Cặp điểm neo -> vị trí bit trong mặt nạ cấu hình."""
+    return _bridges()["BRIDGE_BITS"]  # type: ignore[return-value]
+
+
+def __getattr__(name: str) -> object:
+    if name in ("LEGAL_BRIDGES", "BRIDGE_BITS"):
+        return _bridges()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Mã kết luận lưu trong bảng (3 bit thấp); bit 3 = liên thông; bit 4-7 = mặt nạ đỉnh bậc lẻ
+VERDICT_CODES: Tuple[str, ...] = (euler.EMPTY, euler.DISCONNECTED, euler.CIRCUIT, euler.PATH, euler.NONE)
+CONNECTED_BIT = 1 << 3
+ODD_SHIFT = 4
+
+TABLE_VERSION = 1
+
+
+def _bridge_nodes() -> List[Tuple[int, int]]:
+    """Cặp chỉ số đỉnh (u, v) của từng cầu hợp lệ."""
+    node_index = {node: i for i, node in enumerate(rules.NODE_IDS)}
+    result = []
+    for start_id, end_id in _legal_bridges():
+        start_region, _ = rules.parse_anchor_id(start_id)
+        end_region, _ = rules.parse_anchor_id(end_id)
+        result.append((node_index[rules.REGION_TO_NODE_ID[start_region]], node_index[rules.REGION_TO_NODE_ID[end_region]]))
+    return result
+
+
+def table_path() -> Path:
+    """Đường dẫn tệp bảng trong thư mục cache; tên tệp gắn với phiên bản và danh sách cầu hợp lệ."""
+    from ..paths import cache_dir
+
+    digest = hashlib.sha1(repr((TABLE_VERSION, _legal_bridges())).encode("utf-8")).hexdigest()[:12]
+    return cache_dir() / f"config_table-{digest}.bin"
+
+
+def build_table() -> "np.ndarray":
+    """Phân loại toàn bộ 2^19 cấu hình bằng NumPy, trả về mảng uint8 đánh chỉ số theo mặt nạ.
+
+    Bậc các đỉnh được tính theo thứ tự mã Gray: hai cấu hình liên tiếp chỉ khác nhau một cầu,
+    nên mỗi bước chỉ cộng/trừ 1 vào bậc của hai đỉnh; cộng dồn (cumsum) các thay đổi này cho ra
+    bậc của mọi cấu hình trong một lượt vector hóa.
+    """
+    import numpy as np
+
+    bridge_count = len(_legal_bridges())
+    node_count = len(rules.NODE_IDS)
+    size = 1 << bridge_count
+    bridge_nodes = np.array(_bridge_nodes(), dtype=np.intp)
+
+    # --- Bậc theo thứ tự mã Gray ---------------------------------------------------
+    steps = np.arange(1, size, dtype=np.int64)
+    gray = steps ^ (steps >> 1)
+    flipped = np.log2(steps & -steps).astype(np.intp)  # bit thay đổi ở bước k = số bit 0 cuối của k
+    sign = np.where((gray >> flipped) & 1, 1, -1).astype(np.int8)
+
+    deltas = np.zeros((size, node_count), dtype=np.int8)
+    rows = np.arange(1, size)
+    deltas[rows, bridge_nodes[flipped, 0]] += sign
+    deltas[rows, bridge_nodes[flipped, 1]] += sign
+    degrees_gray = np.cumsum(deltas, axis=0, dtype=np.int8)
+
+    degrees = np.empty_like(degrees_gray)
+    degrees[np.concatenate(([0], gray))] = degrees_gray
+
+    # --- Đỉnh bậc lẻ -----------------------------------------------------------------
+    odd_bits = (degrees & 1).astype(np.uint8)
+    odd_mask = np.zeros(size, dtype=np.uint8)
+    for node in range(node_count):
+        odd_mask |= odd_bits[:, node] << node
+    odd_count = odd_bits.sum(axis=1)
+
+    # --- Liên thông: chỉ phụ thuộc vào việc mỗi cặp đỉnh có ít nhất một cầu hay không -----
+    node_pairs = sorted({tuple(sorted(pair)) for pair in bridge_nodes.tolist()})
+    masks = np.arange(size, dtype=np.int64)
+    pattern = np.zeros(size, dtype=np.intp)
+    for slot, node_pair in enumerate(node_pairs):
+        pair_mask = 0
+        for bit, bridge_pair in enumerate(bridge_nodes.tolist()):
+            if tuple(sorted(bridge_pair)) == node_pair:
+                pair_mask |= 1 << bit
+        pattern |= ((masks & pair_mask) != 0).astype(np.intp) << slot
+
+    connected = np.zeros(1 << len(node_pairs), dtype=bool)
+    spanning = np.zeros(1 << len(node_pairs), dtype=bool)
+    for present in range(1 << len(node_pairs)):
+        engine = euler.EulerEngine(range(node_count))
+        for slot, (u, v) in enumerate(node_pairs):
+            if present >> slot & 1:
+                engine.add_edge(u, v)
+        connected[present] = engine.is_connected()
+        spanning[present] = engine.is_connected() and engine.active_count == node_count
+
+    # --- Kết luận ---------------------------------------------------------------------
+    code = np.full(size, VERDICT_CODES.index(euler.NONE), dtype=np.uint8)
+    code[odd_count == 2] = VERDICT_CODES.index(euler.PATH)
+    code[odd_count == 0] = VERDICT_CODES.index(euler.CIRCUIT)
+    code[~spanning[pattern]] = VERDICT_CODES.index(euler.DISCONNECTED)
+    code[0] = VERDICT_CODES.index(euler.EMPTY)
+
+    return code | (connected[pattern].astype(np.uint8) * CONNECTED_BIT) | (odd_mask << ODD_SHIFT)
+
+
+def write_table(path: Path | None = None) -> Path:
+    """Tính bảng và ghi nguyên tử ra đĩa; trả về đường dẫn tệp."""
+    from ..paths import atomic_write_bytes
+
+    path = path or table_path()
+    atomic_write_bytes(path, build_table().tobytes())
+    return path
+
+
+class ConfigTable:
+    """Bảng phân loại mọi cấu hình cầu, ánh xạ bộ nhớ (memory-mapped) từ tệp cache.
+
+    Tệp chỉ được mở ở lần tra cứu đầu tiên; nếu chưa có thì tính và ghi một lần.
+    Sau đó phân tích một cấu hình là một lần đọc theo chỉ số. Thư mục cache không dùng được
+    thì bảng được tính và giữ trong bộ nhớ của tiến trình.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._data = None
+        self.in_memory = False
+
+    def build(self) -> "np.ndarray":
+        """Mở bảng, tính và ghi tệp trước nếu chưa có (hoặc tính trong bộ nhớ nếu không ghi được)."""
+        if self._data is None:
+            import numpy as np
+
+            try:
+                path = self.path or table_path()
+                if not path.exists() or path.stat().st_size != 1 << len(_legal_bridges()):
+                    write_table(path)
+                self._data = np.memmap(path, dtype=np.uint8, mode="r")
+            except OSError:
+                self._data = build_table()
+                self.in_memory = True
+        return self._data
+
+    @property
+    def data(self) -> "np.ndarray":
+        return self.build()
+
+    @staticmethod
+    def mask_of(pairs: Iterable[Tuple[str, str]]) -> int:
+        """Mặt nạ bit của một tập cầu hợp lệ (ném KeyError nếu có cặp không hợp lệ)."""
+        mask = 0
+        bits = _bridge_bits()
+        for start_id, end_id in pairs:
+            mask |= 1 << bits[pair_key(start_id, end_id)]
+        return mask
+
+    def lookup(self, mask: int) -> Tuple[str, bool, List[str]]:
+        """Trả về (kết luận, liên thông, các đỉnh bậc lẻ) của cấu hình."""
+        entry = int(self.data[mask])
+        odd_mask = entry >> ODD_SHIFT
+        odd_nodes = [node for i, node in enumerate(rules.NODE_IDS) if odd_mask >> i & 1]
+        return VERDICT_CODES[entry & 0b111], bool(entry & CONNECTED_BIT), odd_nodes
+
+
+_default_table: ConfigTable | None = None
+
+
+def get_table() -> ConfigTable:
+    """Bảng dùng chung trong tiến trình (khởi tạo lười)."""
+    global _default_table
+    if _default_table is None:
+        _default_table = ConfigTable()
+    return _default_table
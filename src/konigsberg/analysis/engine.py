@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+# Các kết luận có thể có của phân tích Euler
+EMPTY = "empty"  # chưa có cạnh nào
+DISCONNECTED = "disconnected"  # đồ thị không liên thông hoặc có đỉnh cô lập
+CIRCUIT = "circuit"  # tồn tại chu trình Euler
+PATH = "path"  # chỉ tồn tại đường đi Euler
+NONE = "none"  # số đỉnh bậc lẻ khác 0 và 2
+
+
+class EulerEngine:
+    """Duy trì tăng dần các đại lượng cần cho định lý Euler trên một đa đồ thị vô hướng.
+
+    - Bậc từng đỉnh và số đỉnh bậc lẻ: cập nhật O(1) mỗi lần thêm/xóa cạnh.
+    - Liên thông: union-find khi thêm cạnh. Khi xóa cạnh, liên thông chỉ có thể thay đổi
+      nếu cặp đỉnh mất cạnh song song cuối cùng; khi đó union-find được dựng lại (lười)
+      trên đồ thị các cặp đỉnh kề nhau, chi phí O(số đỉnh + số cặp) chứ không theo số cạnh.
+    - Đường đi/chu trình Euler chỉ được tính khi cần hiển thị và được giữ lại cho tới lần sửa tiếp theo.
+    """
+
+    def __init__(self, nodes: Iterable[str]) -> None:
+        self.nodes: List[str] = list(nodes)
+        self._degrees: Dict[str, int] = {node: 0 for node in self.nodes}
+        # Số cạnh song song giữa mỗi cặp đỉnh (đối xứng)
+        self._adjacency: Dict[str, Dict[str, int]] = {node: {} for node in self.nodes}
+        self.edge_count = 0
+        self.odd_count = 0
+        self.active_count = 0  # số đỉnh có bậc > 0
+
+        # Union-find trên các đỉnh có bậc > 0
+        self._parent: Dict[str, str] = {node: node for node in self.nodes}
+        self._components = 0
+        self._union_find_valid = True
+
+        self._walk: List[str] | None = None
+
+    # --- Cập nhật --------------------------------------------------------------
+    def add_edge(self, u: str, v: str) -> None:
+        """Thêm một cạnh u-v."""
+        self._walk = None
+        self.edge_count += 1
+        for node in (u, v):
+            if self._degrees[node] == 0:
+                self.active_count += 1
+                self._components += 1
+            self._bump_degree(node, 1)
+        self._adjacency[u][v] = self._adjacency[u].get(v, 0) + 1
+        if u != v:
+            self._adjacency[v][u] = self._adjacency[v].get(u, 0) + 1
+        if self._union_find_valid:
+            self._union(u, v)
+
+    def remove_edge(self, u: str, v: str) -> bool:
+        """Xóa một cạnh u-v; trả về False nếu không có cạnh nào giữa hai đỉnh."""
+        count = self._adjacency[u].get(v, 0)
+        if count == 0:
+            return False
+        self._walk = None
+        self.edge_count -= 1
+        if count == 1:
+            del self._adjacency[u][v]
+            if u != v:
+                del self._adjacency[v][u]
+            # Mất cạnh song song cuối cùng: liên thông có thể bị tách, dựng lại khi cần
+            self._union_find_valid = False
+        else:
+            self._adjacency[u][v] = count - 1
+            if u != v:
+                self._adjacency[v][u] = count - 1
+        for node in (u, v):
+            self._bump_degree(node, -1)
+            if self._degrees[node] == 0:
+                self.active_count -= 1
+        return True
+
+    def _bump_degree(self, node: str, delta: int) -> None:
+        degree = self._degrees[node]
+        self.odd_count += -1 if degree % 2 else 1
+        self._degrees[node] = degree + delta
+
+    # --- Union-find ------------------------------------------------------------
+    def _find(self, node: str) -> str:
+        parent = self._parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:  # nén đường đi
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union(self, u: str, v: str) -> None:
+        root_u, root_v = self._find(u), self._find(v)
+        if root_u != root_v:
+            self._parent[root_u] = root_v
+            self._components -= 1
+
+    def _rebuild_union_find(self) -> None:
+        self._parent = {node: node for node in self.nodes}
+        self._components = self.active_count
+        for u, neighbors in self._adjacency.items():
+            for v in neighbors:
+                self._union(u, v)
+        self._union_find_valid = True
+
+    # --- Truy vấn --------------------------------------------------------------
+    def degree(self, node: str) -> int:
+        return self._degrees[node]
+
+    def degrees(self) -> Dict[str, int]:
+        """Bậc của tất cả các đỉnh (bản sao)."""
+        return dict(self._degrees)
+
+    def edge_multiplicity(self, u: str, v: str) -> int:
+        """Số cạnh song song giữa u và v."""
+        return self._adjacency[u].get(v, 0)
+
+    def odd_nodes(self) -> List[str]:
+        return [node for node in self.nodes if self._degrees[node] % 2]
+
+    def isolated_nodes(self) -> List[str]:
+        return [node for node in self.nodes if self._degrees[node] == 0]
+
+    def is_connected(self) -> bool:
+        """Các đỉnh có cạnh có nằm trong cùng một thành phần liên thông không."""
+        if not self._union_find_valid:
+            self._rebuild_union_find()
+        return self._components <= 1
+
+    def verdict(self) -> str:
+        """Kết luận Euler cho đồ thị hiện tại (một trong EMPTY/DISCONNECTED/CIRCUIT/PATH/NONE).
+
+        Giống quy ước của giao diện: đỉnh cô lập cũng làm đồ thị không có đường đi Euler.
+        """
+        if self.edge_count == 0:
+            return EMPTY
+        if not self.is_connected() or self.active_count < len(self.nodes):
+            return DISCONNECTED
+        if self.odd_count == 0:
+            return CIRCUIT
+        if self.odd_count == 2:
+            return PATH
+        return NONE
+
+    def pair_counts(self) -> List[Tuple[str, str, int]]:
+        """Danh sách (u, v, số cạnh) với u đứng trước v trong thứ tự đỉnh."""
+        order = {node: i for i, node in enumerate(self.nodes)}
+        return [
+            (u, v, count)
+            for u, neighbors in self._adjacency.items()
+            for v, count in neighbors.items()
+            if order[u] <= order[v]
+        ]
+
+    def walk(self) -> List[str]:
+        """Dãy đỉnh của chu trình/đường đi Euler (tính lười, giữ lại tới lần sửa tiếp theo).
+
+        Chỉ gọi khi `verdict()` là CIRCUIT hoặc PATH.
+        """
+        if self._walk is None:
+            self._walk = self._compute_walk()
+        return self._walk
+
+    def _compute_walk(self) -> List[str]:
+        from .. import euler  # NumPy chỉ được nạp khi thực sự cần tính đường đi
+
+        return euler.walk_labels(self.nodes, self.pair_counts())
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Tuple
+
+
+class AnalysisEntry(NamedTuple):
+    """Kết quả phân tích đã hoàn chỉnh của một trạng thái đồ thị."""
+
+    lines: Tuple[str, ...]  # các dòng văn bản đã ngắt dòng
+    walk: Tuple[str, ...] | None  # đường đi/chu trình Euler (nếu có)
+
+
+class AnalysisMemo:
+    """Cache LRU cho kết quả phân tích, khóa theo vector số cạnh chuẩn của đồ thị (và tham số ngắt dòng).
+
+    Người dùng thường thêm rồi xóa cùng một cầu; trạng thái cũ được phục vụ lại bằng một lần tra dict
+    thay vì tính lại kết luận, đường đi Euler và ngắt dòng.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, AnalysisEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> AnalysisEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, lines: List[str], walk: List[str] | None) -> None:
+        self._entries[key] = AnalysisEntry(tuple(lines), None if walk is None else tuple(walk))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Số mục, số lần trúng/trượt và tỉ lệ trúng cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import random
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from . import engine as euler
+
+if TYPE_CHECKING:
+    from ..maps import CompiledMap
+
+NodePair = Tuple[str, str]
+
+
+class PairChange(NamedTuple):
+    """Thay đổi số cầu giữa hai đỉnh: +1/+2 là xây thêm, -1 là bỏ một cầu."""
+
+    u: str
+    v: str
+    delta: int
+
+
+class Fix(NamedTuple):
+    """Cách sửa ít thay đổi nhất để đồ thị có đường đi hoặc chu trình Euler."""
+
+    changes: Tuple[PairChange, ...]
+    verdict: str  # CIRCUIT hoặc PATH sau khi sửa
+    optimal: bool  # False nếu tìm kiếm dừng sớm vì hết ngân sách (kết quả tốt nhất đã tìm được)
+
+    @property
+    def cost(self) -> int:
+        return sum(abs(change.delta) for change in self.changes)
+
+
+def legal_pair_counts(map_definition: "CompiledMap") -> Dict[NodePair, int]:
+    """Số cầu hợp lệ (theo bảng cặp điểm neo) giữa mỗi cặp đỉnh, khóa (u, v) theo thứ tự đỉnh của bản đồ."""
+    region_of = {f"{t.region}_{t.index}": t.region for t in map_definition.anchors}
+    order = {node: i for i, node in enumerate(map_definition.node_ids)}
+    counts: Dict[NodePair, int] = {}
+    for start_id, end_id in map_definition.partners.pairs():
+        u = map_definition.region_to_node[region_of[start_id]]
+        v = map_definition.region_to_node[region_of[end_id]]
+        if order[u] > order[v]:
+            u, v = v, u
+        counts[(u, v)] = counts.get((u, v), 0) + 1
+    return counts
+
+
+def _components(node_count: int, edges: Iterable[Tuple[int, int]]) -> Tuple[int, Tuple[int, ...]]:
+    """Số thành phần liên thông và nhãn chuẩn (gốc nhỏ nhất) của từng đỉnh."""
+    parent = list(range(node_count))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    components = node_count
+    for a, b in edges:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+            components -= 1
+    return components, tuple(find(node) for node in range(node_count))
+
+
+def _greedy_deltas(
+    node_count: int,
+    pairs: List[Tuple[int, int]],
+    current: Dict[Tuple[int, int], int],
+    addable: Dict[Tuple[int, int], int],
+    order: Sequence[int] | None = None,
+    rounds: int = 8,
+) -> List[int] | None:
+    """Lời giải tham lam (cận trên cho nhánh-cận), lặp tối đa `rounds` vòng:
+
+    1. nối các thành phần bằng cầu mới kiểu Kruskal;
+    2. ghép từng cặp đỉnh lẻ gần nhau, lật chẵn lẻ dọc đường đi ngắn nhất (BFS) giữa chúng, ưu tiên các
+       cặp lật được mà không mất cầu; nếu việc bỏ cầu làm mất liên thông thì vòng sau nối lại.
+
+    `order` là thứ tự xét các cặp (mặc định theo vị trí); đổi thứ tự cho ra lời giải tham lam khác.
+    """
+    if order is None:
+        order = range(len(pairs))
+    deltas = [0] * len(pairs)
+    adjacency: List[List[int]] = [[] for _ in range(node_count)]
+    for position in order:
+        a, b = pairs[position]
+        adjacency[a].append(position)
+        adjacency[b].append(position)
+
+    def flip_delta(position: int, keep_present: bool) -> int | None:
+        """Delta mới khi lật chẵn lẻ của cặp (None nếu không lật được); delta nhỏ nhất được ưu tiên."""
+        count, delta = current.get(pairs[position], 0), deltas[position]
+        candidates = [d for d in (delta - 1, delta + 1) if -min(count, 1) <= d <= addable.get(pairs[position], 0)]
+        if keep_present:
+            candidates = [d for d in candidates if count + d > 0 or count + delta == 0]
+        else:
+            # Được bỏ cầu cuối của cặp, miễn là hai đỉnh còn cầu khác (tránh tạo đỉnh cô lập)
+            a, b = pairs[position]
+            candidates = [
+                d for d in candidates
+                if count + d > 0 or count + delta == 0 or min(present_pairs(a), present_pairs(b)) > 1
+            ]
+        return min(candidates, key=abs) if candidates else None
+
+    def present_pairs(node: int) -> int:
+        return sum(1 for position in adjacency[node] if current.get(pairs[position], 0) + deltas[position] > 0)
+
+    def odd_nodes() -> List[int]:
+        odd = [0] * node_count
+        for position, (a, b) in enumerate(pairs):
+            if (current.get((a, b), 0) + deltas[position]) % 2:
+                odd[a] ^= 1
+                odd[b] ^= 1
+        return [node for node in range(node_count) if odd[node]]
+
+    def shortest_flip_path(source: int, targets: set, keep_present: bool) -> List[int] | None:
+        previous: Dict[int, int] = {source: -1}
+        queue = [source]
+        for node in queue:
+            if node in targets:
+                path = []
+                while node != source:
+                    position = previous[node]
+                    path.append(position)
+                    a, b = pairs[position]
+                    node = b if node == a else a
+                return path
+            for position in adjacency[node]:
+                a, b = pairs[position]
+                other = b if node == a else a
+                if other not in previous and flip_delta(position, keep_present) is not None:
+                    previous[other] = position
+                    queue.append(other)
+        return None
+
+    for _ in range(rounds):
+        parent = list(range(node_count))
+
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for position, pair in enumerate(pairs):
+            if current.get(pair, 0) + deltas[position] > 0:
+                parent[find(pair[0])] = find(pair[1])
+        for position in order:
+            a, b = pairs[position]
+            if current.get((a, b), 0) + deltas[position] == 0 and deltas[position] < addable.get((a, b), 0) and find(a) != find(b):
+                deltas[position] += 1
+                parent[find(a)] = find(b)
+
+        odd = odd_nodes()
+        while len(odd) > 2:
+            source = odd.pop(0)
+            keep_present = True
+            path = shortest_flip_path(source, set(odd), keep_present)
+            if path is None:
+                keep_present = False
+                path = shortest_flip_path(source, set(odd), keep_present)
+            if path is None:
+                return None
+            flipped = [flip_delta(position, keep_present) for position in path]
+            for position, delta in zip(path, flipped):
+                deltas[position] = delta
+            odd = odd_nodes()
+        present = [pair for position, pair in enumerate(pairs) if current.get(pair, 0) + deltas[position] > 0]
+        if _components(node_count, present)[0] == 1:
+            return deltas
+    return None
+
+
+def minimal_fix(
+    nodes: Sequence[str],
+    pair_counts: Iterable[Tuple[str, str, int]],
+    legal_counts: Dict[NodePair, int],
+    time_limit: float = 0.05,
+) -> Fix | None:
+    """Tập thêm/bỏ cầu nhỏ nhất để đồ thị liên thông, không có đỉnh cô lập và có 0 hoặc 2 đỉnh bậc lẻ.
+
+    Chỉ số cầu giữa mỗi cặp đỉnh là quan trọng, nên bài toán được thu gọn theo cặp đỉnh: mỗi cặp chỉ
+    cần xét bỏ 1 cầu, giữ nguyên, thêm 1 cầu hoặc (khi chưa có cầu) thêm 2 cầu để nối mà không đổi chẵn lẻ;
+    có thể thêm tối đa (số cầu hợp lệ - số cầu đã xây). Nhánh-cận trên các cặp, xuất phát từ lời giải
+    tham lam, với:
+
+    - vector chẵn lẻ dạng mặt nạ bit: mỗi thay đổi lật tối đa 2 đỉnh, nên cần ít nhất (số đỉnh lẻ - 2) / 2 bước;
+    - liên thông: mỗi cầu mới giảm số thành phần tối đa 1; nhánh không thể phủ mọi đỉnh bị cắt ngay;
+    - bảng chuyển vị theo (vị trí, mặt nạ chẵn lẻ, phân hoạch liên thông đã chốt) để bỏ trạng thái lặp lại.
+
+    Trả về None nếu không thể sửa bằng các cầu hợp lệ (hoặc, với bản đồ rất lớn, không tìm được lời giải
+    nào trong `time_limit` giây). Hết thời gian thì trả về lời giải tốt nhất đã tìm được với `optimal=False`.
+    """
+    deadline = perf_counter() + time_limit
+    node_count = len(nodes)
+    if node_count == 0:
+        return None
+    index = {node: i for i, node in enumerate(nodes)}
+    current: Dict[Tuple[int, int], int] = {}
+    for u, v, count in pair_counts:
+        a, b = sorted((index[u], index[v]))
+        if a != b and count:  # khuyên không đổi chẵn lẻ và không giúp liên thông
+            current[(a, b)] = current.get((a, b), 0) + count
+    addable: Dict[Tuple[int, int], int] = {}
+    for (u, v), legal in legal_counts.items():
+        a, b = sorted((index[u], index[v]))
+        if a != b:
+            addable[(a, b)] = addable.get((a, b), 0) + legal
+    for pair, count in current.items():
+        addable[pair] = max(0, addable.get(pair, 0) - count)
+
+    parity = 0
+    for (a, b), count in current.items():
+        if count % 2:
+            parity ^= (1 << a) | (1 << b)
+
+    # Các lựa chọn của từng cặp: (delta, lật chẵn lẻ?, có cầu sau khi đổi?)
+    pairs = sorted(set(current) | {pair for pair, count in addable.items() if count})
+    options: List[List[Tuple[int, bool, bool]]] = []
+    for pair in pairs:
+        count, extra = current.get(pair, 0), addable.get(pair, 0)
+        choices = [(0, False, count > 0)]
+        if extra >= 1:
+            choices.append((1, True, True))
+        if count >= 1:
+            choices.append((-1, True, count > 1))
+        if count == 0 and extra >= 2:
+            choices.append((2, False, True))
+        options.append(choices)
+
+    # Không thể nối mọi đỉnh dù thêm hết cầu hợp lệ: không có lời giải
+    if node_count > 1 and _components(node_count, pairs)[0] > 1:
+        return None
+
+    # Tham lam với thứ tự mặc định, rồi với các thứ tự xáo trộn (tất định) cho tới khi tìm được lời giải
+    best = _greedy_deltas(node_count, pairs, current, addable)
+    shuffler = random.Random(0)
+    while best is None and perf_counter() < deadline:
+        order = list(range(len(pairs)))
+        shuffler.shuffle(order)
+        best = _greedy_deltas(node_count, pairs, current, addable, order)
+    best_cost = sum(map(abs, best)) if best is not None else len(pairs) * 2 + 1
+    chosen: List[int] = []
+    seen: Dict[Tuple[int, int, Tuple[int, ...]], int] = {}
+    expanded = 0
+    timed_out = False
+
+    def search(position: int, mask: int, cost: int, decided: List[Tuple[int, int]]) -> None:
+        nonlocal best_cost, best, expanded, timed_out
+        expanded += 1
+        if timed_out or (expanded & 15 == 0 and perf_counter() > deadline):
+            timed_out = True
+            return
+        parity_bound = max(0, (bin(mask).count("1") - 1) // 2)
+        if cost + parity_bound >= best_cost:
+            return
+        remaining = pairs[position:]
+        # Cận liên thông: đồ thị của các cặp đã chốt có cầu và các cặp chưa xét đang có cầu
+        existing = decided + [pair for pair in remaining if pair in current]
+        components, _ = _components(node_count, existing)
+        if cost + max(parity_bound, components - 1) >= best_cost:
+            return
+        if position == len(pairs):
+            if components == 1 and bin(mask).count("1") <= 2:
+                best_cost, best = cost, list(chosen)
+            return
+        # Không thể nối mọi đỉnh nữa: nhánh chết
+        if _components(node_count, decided + remaining)[0] > 1:
+            return
+        state = (position, mask, _components(node_count, decided)[1])
+        if seen.get(state, best_cost + 1) <= cost:
+            return
+        seen[state] = cost
+
+        a, b = pairs[position]
+        for delta, flips, present in options[position]:
+            chosen.append(delta)
+            search(
+                position + 1,
+                mask ^ ((1 << a) | (1 << b)) if flips else mask,
+                cost + abs(delta),
+                decided + [(a, b)] if present else decided,
+            )
+            chosen.pop()
+
+    search(0, parity, 0, [])
+    if best is None:
+        return None
+
+    changes = []
+    final_parity = parity
+    for (a, b), delta in zip(pairs, best):
+        if delta:
+            changes.append(PairChange(nodes[a], nodes[b], delta))
+        if delta % 2:
+            final_parity ^= (1 << a) | (1 << b)
+    verdict = euler.CIRCUIT if final_parity == 0 else euler.PATH
+    return Fix(tuple(changes), verdict, not timed_out)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+from ..maps import default_map
+from ..maps.compiler import PartnerTable
+
+AnchorRef = Tuple[str, str, int]  # (ID điểm neo, vùng, chỉ số)
+
+# Các hằng số dưới đây được suy ra từ tệp bản đồ Königsberg đi kèm gói (maps/konigsberg.json).
+# Bản đồ chỉ được nạp ở lần truy cập đầu tiên (qua __getattr__ của module), không phải lúc import:
+# - REGION_TO_NODE_ID: vùng đất -> ID đỉnh của đồ thị (1=Bắc, 2=Kneiphof, 3=Lomse, 4=Nam)
+# - NODE_IDS: các ID đỉnh theo thứ tự
+# - REGION_ANCHOR_COUNTS: số điểm neo của từng vùng (ID điểm neo có dạng "<vùng>_<chỉ số>")
+REGION_TO_NODE_ID: Dict[str, str]
+NODE_IDS: List[str]
+REGION_ANCHOR_COUNTS: Dict[str, int]
+
+_CONSTANTS: Dict[str, object] = {}
+
+
+def _constants() -> Dict[str, object]:
+    if not _CONSTANTS:
+        compiled = default_map()
+        _CONSTANTS.update(
+            REGION_TO_NODE_ID=dict(compiled.region_to_node),
+            NODE_IDS=compiled.node_ids,
+            REGION_ANCHOR_COUNTS=dict(compiled.anchor_counts),
+        )
+    return _CONSTANTS
+
+
+def __getattr__(name: str) -> object:
+    if name in ("REGION_TO_NODE_ID", "NODE_IDS", "REGION_ANCHOR_COUNTS"):
+        return _constants()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def anchor_refs() -> List[AnchorRef]:
+    """Tất cả điểm neo của bản đồ dưới dạng (ID, vùng, chỉ số)."""
+    return [
+        (f"{region}_{index}", region, index)
+        for region, count in default_map().anchor_counts.items()
+        for index in range(count)
+    ]
+
+
+def parse_anchor_id(anchor_id: str) -> Tuple[str, int]:
+    """Tách ID điểm neo thành (vùng, chỉ số); ném ValueError nếu ID không tồn tại trên bản đồ."""
+    anchor_counts = default_map().anchor_counts
+    region, sep, index_text = anchor_id.rpartition("_")
+    if not sep or region not in anchor_counts or not index_text.isdigit():
+        raise ValueError(f"Điểm neo không hợp lệ: {anchor_id!r}")
+    index = int(index_text)
+    if index >= anchor_counts[region]:
+        raise ValueError(f"Điểm neo không hợp lệ: {anchor_id!r}")
+    return region, index
+
+
+def default_partner_table() -> PartnerTable:
+    """Bảng quy tắc đã biên dịch cho bản đồ Königsberg (dùng chung)."""
+    return default_map().partners
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from math import factorial, prod
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Giới hạn kích thước không gian trạng thái (số đỉnh x tích (số cạnh + 1) của các cặp) và số cạnh
+# (độ sâu đệ quy); vượt quá thì không đếm. Bản đồ Königsberg đủ 19 cầu chỉ có 10 000 trạng thái;
+# giới hạn giữ thời gian đếm (ở luồng nền) dưới khoảng 0,1 giây và bảng ghi nhớ vừa phải.
+MAX_STATES = 250_000
+MAX_EDGES = 400
+
+
+class EulerWalks:
+    """Đếm và liệt kê theo thứ hạng mọi đường đi/chu trình Euler phân biệt của một đa đồ thị nhỏ.
+
+    Hai đường đi được coi là khác nhau khi dãy đỉnh khác nhau: các cầu song song được gộp thành số đếm
+    theo cặp đỉnh, nên trạng thái quy hoạch động là (đỉnh hiện tại, vector số cạnh còn lại của từng cặp)
+    thay vì tập cạnh đã đi. Vector được mã hóa thành một số nguyên (cơ số hỗn hợp số cạnh + 1 của từng cặp)
+    và số cách đi hết từ mỗi trạng thái được ghi nhớ, nên cả đếm lẫn lấy đường đi thứ k (unrank) chỉ
+    duyệt các trạng thái một lần.
+
+    Đường đi Euler bắt đầu ở một trong hai đỉnh bậc lẻ (cả hai chiều đều được đếm); chu trình Euler bắt
+    đầu và kết thúc ở đỉnh có cạnh đứng đầu theo thứ tự đỉnh. Đồ thị không có đường đi Euler cho tổng 0.
+    """
+
+    def __init__(self, nodes: Sequence[str], pair_counts: Iterable[Tuple[str, str, int]]) -> None:
+        self.nodes = list(nodes)
+        index = {node: i for i, node in enumerate(self.nodes)}
+        degrees = [0] * len(self.nodes)
+        self._counts: List[int] = []
+        self._weights: List[int] = []
+        # Danh sách kề theo thứ tự đỉnh: (đỉnh kề, vị trí cặp); khuyên chỉ có một mục
+        self._adjacency: List[List[Tuple[int, int]]] = [[] for _ in self.nodes]
+        weight = 1
+        for u, v, count in pair_counts:
+            if count <= 0:
+                continue
+            a, b = index[u], index[v]
+            position = len(self._counts)
+            self._counts.append(count)
+            self._weights.append(weight)
+            weight *= count + 1
+            self._adjacency[a].append((b, position))
+            if a != b:
+                self._adjacency[b].append((a, position))
+            degrees[a] += count
+            degrees[b] += count
+        for neighbors in self._adjacency:
+            neighbors.sort()
+        self._full = sum(count * weight for count, weight in zip(self._counts, self._weights))
+        self.edge_count = sum(self._counts)
+        self.state_count = len(self.nodes) * weight
+        self._memo: Dict[int, int] = {}
+        self._total: int | None = None
+
+        odd = [node for node, degree in enumerate(degrees) if degree % 2]
+        if len(odd) == 2:
+            self.starts = odd
+        elif not odd and self.edge_count:
+            self.starts = [next(node for node, degree in enumerate(degrees) if degree)]
+        else:
+            self.starts = []
+
+    @property
+    def feasible(self) -> bool:
+        """Không gian trạng thái đủ nhỏ để đếm."""
+        return self.state_count <= MAX_STATES and self.edge_count <= MAX_EDGES
+
+    def count(self) -> int:
+        """Đếm số dãy đỉnh phân biệt (đường đi/chu trình Euler), điền bảng ghi nhớ cho các lần unrank sau.
+
+        Tốn thời gian tỉ lệ với số trạng thái; giao diện gọi hàm này ở luồng nền.
+        """
+        if self._total is None:
+            self._total = sum(self._count(start, self._full) for start in self.starts)
+        return self._total
+
+    @property
+    def total(self) -> int:
+        """Số dãy đỉnh phân biệt (đường đi/chu trình Euler)."""
+        return self.count()
+
+    @property
+    def bridge_total(self) -> int:
+        """Số đường đi khi phân biệt từng cầu: mỗi dãy đỉnh ứng với c! cách đi c cầu song song của mỗi cặp."""
+        return self.total * prod(factorial(count) for count in self._counts)
+
+    def _remaining(self, code: int, position: int) -> int:
+        return code // self._weights[position] % (self._counts[position] + 1)
+
+    def _count(self, node: int, code: int) -> int:
+        """Số cách đi hết các cạnh còn lại (mã `code`) bắt đầu từ `node`."""
+        if code == 0:
+            return 1
+        key = code * len(self.nodes) + node
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        total = 0
+        for neighbor, position in self._adjacency[node]:
+            if self._remaining(code, position):
+                total += self._count(neighbor, code - self._weights[position])
+        self._memo[key] = total
+        return total
+
+    def walk(self, rank: int) -> List[str]:
+        """Đường đi thứ `rank` (từ 0) theo thứ tự từ điển của (đỉnh bắt đầu, dãy đỉnh theo thứ tự đỉnh)."""
+        if not 0 <= rank < self.total:
+            raise IndexError(f"Không có đường đi Euler thứ {rank}")
+        for node in self.starts:
+            count = self._count(node, self._full)
+            if rank < count:
+                break
+            rank -= count
+        code = self._full
+        sequence = [node]
+        while code:
+            for neighbor, position in self._adjacency[node]:
+                if not self._remaining(code, position):
+                    continue
+                count = self._count(neighbor, code - self._weights[position])
+                if rank < count:
+                    node, code = neighbor, code - self._weights[position]
+                    sequence.append(node)
+                    break
+                rank -= count
+        return [self.nodes[node] for node in sequence]
+
+    def page(self, number: int, size: int) -> List[Tuple[int, List[str]]]:
+        """Các đường đi (thứ hạng, dãy đỉnh) của trang `number` (từ 0), mỗi trang `size` đường đi."""
+        first = number * size
+        return [(rank, self.walk(rank)) for rank in range(first, min(first + size, self.total))]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, NamedTuple, Sequence, Tuple
+
+from .engine import EulerEngine
+from .walks import EulerWalks
+
+
+def compute_walk(nodes: Sequence[str], pair_counts: Sequence[Tuple[str, str, int]]) -> List[str]:
+    """Tính đường đi/chu trình Euler từ một bản chụp (u, v, số cạnh) của đồ thị, không đụng tới trạng thái giao diện."""
+    engine = EulerEngine(nodes)
+    for u, v, count in pair_counts:
+        for _ in range(count):
+            engine.add_edge(u, v)
+    return engine.walk()
+
+
+def compute_walks(nodes: Sequence[str], pair_counts: Sequence[Tuple[str, str, int]]) -> Tuple[List[str], EulerWalks | None]:
+    """Đường đi Euler đầu tiên và bộ đếm mọi đường đi (đã đếm xong); đồ thị quá lớn để đếm thì chỉ có một đường đi."""
+    walks = EulerWalks(nodes, pair_counts)
+    if not walks.feasible:
+        return compute_walk(nodes, pair_counts), None
+    walks.count()
+    return walks.walk(0), walks
+
+
+class WalkResult(NamedTuple):
+    generation: int
+    walk: List[str] | None  # None nếu tính thất bại
+    walks: EulerWalks | None  # bộ đếm đường đi Euler (None nếu đồ thị quá lớn để đếm hoặc tính thất bại)
+
+
+class AnalysisWorker:
+    """Tính đường đi Euler (và đếm mọi đường đi) trong một luồng nền để vòng lặp sự kiện không bao giờ phải chờ.
+
+    Mỗi yêu cầu mang một số thế hệ (generation). Khi đồ thị đổi, `invalidate()` tăng thế hệ và hủy
+    yêu cầu đang chờ; kết quả của thế hệ cũ bị bỏ khi `poll()`.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="konigsberg-analysis")
+        self.generation = 0
+        self._future: Future | None = None
+        self._future_generation = -1
+
+    @property
+    def pending(self) -> bool:
+        """Đang có yêu cầu của thế hệ hiện tại chưa có kết quả."""
+        return self._future is not None and self._future_generation == self.generation
+
+    def invalidate(self) -> None:
+        """Đồ thị đã đổi: mọi kết quả đang chờ trở thành cũ."""
+        self.generation += 1
+        if self._future is not None:
+            self._future.cancel()  # chỉ có tác dụng nếu luồng nền chưa bắt đầu chạy
+            self._future = None
+
+    def submit(self, nodes: Sequence[str], pair_counts: Sequence[Tuple[str, str, int]]) -> int:
+        """Gửi yêu cầu tính đường đi cho bản chụp đồ thị; trả về thế hệ của yêu cầu."""
+        self.invalidate()
+        self._future = self._executor.submit(compute_walks, list(nodes), list(pair_counts))
+        self._future_generation = self.generation
+        return self.generation
+
+    def poll(self) -> WalkResult | None:
+        """Kết quả của thế hệ hiện tại nếu đã xong (không chặn); None nếu chưa xong hoặc đã cũ."""
+        future = self._future
+        if future is None or not future.done():
+            return None
+        self._future = None
+        if self._future_generation != self.generation:
+            return None
+        try:
+            walk, walks = future.result()
+        except Exception:
+            walk, walks = None, None
+        return WalkResult(self._future_generation, walk, walks)
+
+    def shutdown(self) -> None:
+        self.invalidate()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,28 @@
 from __future__ import annotations
 
 import pygame
-from typing import Optional
+from typing import Callable, Iterable, List, Optional
 
+from .graphics.fonts import get_font_registry
+from .graphics.text_cache import get_text_cache
+from .maps import default_map, load_map
+from .profiler import FrameProfiler
+from .recording import InputRecorder, MonotonicClock
 from .screens.main_screen import MainScreen
 from .screens.base import Screen
+from .startup import startup_trace
+
+
+# Các loại sự kiện ứng dụng thực sự dùng; phần còn lại bị chặn ngay ở tầng SDL
+ALLOWED_EVENTS = [
+    pygame.QUIT,
+    pygame.KEYDOWN,
+    pygame.MOUSEBUTTONDOWN,
+    pygame.MOUSEBUTTONUP,
+    pygame.MOUSEMOTION,
+    pygame.VIDEOEXPOSE,
+    pygame.WINDOWEXPOSED,
+]
 
 
 class App:
@@ -13,10 +31,47 @@ class App:
     Sử dụng như một context manager để đảm bảo `pygame.quit()` luôn được gọi.
     """
 
-    def __init__(self, width: int = 1540, height: int = 800, title: str = "Königsberg - Graph UI") -> None:
+    def __init__(
+        self,
+        width: int = 1540,
+        height: int = 800,
+        title: str = "Königsberg - Graph UI",
+        dirty_rects: bool = True,
+        idle_wait: bool = True,
+        max_frame_rate: int = 60,
+        profile_path: Optional[str] = None,
+        map_path: Optional[str] = None,
+        session_path: Optional[str] = None,
+        background_analysis: bool = True,
+        record_path: Optional[str] = None,
+        get_ticks: Optional[Callable[[], int]] = None,
+    ) -> None:
         self.width = width
         self.height = height
         self.title = title
+        # Chỉ đẩy các vùng thay đổi lên màn hình thay vì flip toàn bộ cửa sổ
+        self.dirty_rects = dirty_rects
+        # Khi màn hình rảnh, chặn ở pygame.event.wait thay vì vẽ lại 60 lần/giây
+        self.idle_wait = idle_wait
+        self.max_frame_rate = max_frame_rate
+        # Đo thời gian từng pha của frame (F3 bật/tắt overlay); ghi JSON khi thoát nếu có đường dẫn
+        self.profiler = FrameProfiler()
+        self.profiler.add_stats_source("text_cache", get_text_cache().stats)
+        self.profiler.add_stats_source("fonts", get_font_registry().stats)
+        self.profile_path = profile_path
+        # Bản đồ đã biên dịch từ tệp khai báo (mặc định: Königsberg đi kèm gói)
+        with startup_trace.phase("init"):
+            self.map_definition = load_map(map_path) if map_path else default_map()
+        # Nhật ký phiên: khôi phục danh sách cầu khi mở và ghi lại mọi thao tác (None = không lưu)
+        self.session_path = session_path
+        # Tính đường đi Euler ở luồng nền để xử lý sự kiện không bao giờ phải chờ phân tích
+        self.background_analysis = background_analysis
+        # Đồng hồ mili giây của ứng dụng (nhận diện double click, dấu thời gian khi ghi thao tác);
+        # trình phát lại thay bằng đồng hồ ảo
+        self.get_ticks: Callable[[], int] = get_ticks or MonotonicClock()
+        # Ghi các sự kiện đầu vào ra tệp nhị phân để phát lại (None = không ghi)
+        self.record_path = record_path
+        self.recorder: Optional[InputRecorder] = None
 
         self.screen_surface: Optional[pygame.Surface] = None
         self.clock: Optional[pygame.time.Clock] = None
@@ -25,20 +80,40 @@ class App:
 
     # --- Resource management -------------------------------------------------
     def __enter__(self) -> "App":
-        pygame.init()
-        pygame.display.set_caption(self.title)
-        self.screen_surface = pygame.display.set_mode((self.width, self.height))
-        self.clock = pygame.time.Clock()
-
-        # Màn hình chính
-        self.active_screen = MainScreen(self)
+        with startup_trace.phase("init"):
+            # Chỉ khởi tạo các hệ con thực sự dùng; pygame.init() còn bật cả âm thanh và joystick
+            pygame.display.init()
+            pygame.font.init()
+            pygame.display.set_caption(self.title)
+            self.screen_surface = pygame.display.set_mode((self.width, self.height))
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(ALLOWED_EVENTS)
+            self.clock = pygame.time.Clock()
+
+            # Màn hình chính (khôi phục phiên có thể lỗi: vẫn tắt Pygame trước khi báo lỗi)
+            try:
+                self.active_screen = MainScreen(self)
+            except BaseException:
+                self.__exit__(None, None, None)
+                raise
+        if self.record_path:
+            self.recorder = InputRecorder(self.record_path, self.width, self.height, self.map_definition.name)
         self.running = True
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:  # noqa: ANN001 - theo ngữ cảnh context manager
         try:
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+            if self.active_screen is not None:
+                self.active_screen.close()
             self.active_screen = None
+            if self.profile_path:
+                self.profiler.dump(self.profile_path)
         finally:
+            # Font không còn dùng được sau khi tắt hệ con font (dùng lại sẽ làm hỏng tiến trình)
+            get_font_registry().clear()
             pygame.quit()
 
     # --- Main loop -----------------------------------------------------------
@@ -46,19 +121,83 @@ class App:
         assert self.screen_surface is not None, "App chưa được khởi tạo đúng cách"
         assert self.clock is not None, "Clock chưa được khởi tạo"
 
+        profiler = self.profiler
+        dt_ms = 0
         while self.running:
-            dt_ms = self.clock.tick(60)  # giới hạn 60 FPS và lấy delta time (ms)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif self.active_screen is not None:
-                    self.active_screen.handle_event(event)
-
             if self.active_screen is not None:
-                self.active_screen.update(dt_ms)
-                self.active_screen.draw(self.screen_surface)
-
-            pygame.display.flip()
-
-
+                with profiler.phase("frame"):
+                    with profiler.phase("update"):
+                        self.active_screen.update(dt_ms)
+                    with startup_trace.phase("first_draw"):  # chỉ đo ở frame đầu tiên
+                        self._render_frame()
+                startup_trace.finish()
+
+            frame_rate = self._frame_rate()
+            if frame_rate == 0:
+                # Rảnh: ngủ tới khi có sự kiện, không tốn CPU
+                events: List[pygame.event.Event] = [pygame.event.wait()]
+                events.extend(pygame.event.get())
+                dt_ms = self.clock.tick()
+            else:
+                dt_ms = self.clock.tick(frame_rate)  # giới hạn FPS và lấy delta time (ms)
+                events = pygame.event.get()
+
+            with profiler.phase("events"):
+                self._dispatch_events(events)
+
+    def _frame_rate(self) -> int:
+        """FPS cho frame tiếp theo; 0 nghĩa là chờ sự kiện."""
+        hint = self.active_screen.frame_rate_hint() if self.active_screen is not None else 0
+        if hint == 0 and not self.idle_wait:
+            return self.max_frame_rate
+        return min(hint, self.max_frame_rate)
+
+    def _render_frame(self) -> None:
+        """Vẽ màn hình hiện tại và đẩy các vùng thay đổi lên cửa sổ."""
+        assert self.active_screen is not None
+        with self.profiler.phase("main_draw"):
+            self.active_screen.draw(self.screen_surface)
+        damage = self.active_screen.get_damage()
+
+        if self.profiler.overlay_visible:
+            overlay_rect = self.profiler.draw_overlay(self.screen_surface)
+            if damage is not None:
+                damage.append(overlay_rect)
+
+        with self.profiler.phase("present"):
+            if damage is None or not self.dirty_rects:
+                pygame.display.flip()
+            elif damage:
+                pygame.display.update(damage)
+
+    def _dispatch_events(self, events: Iterable[pygame.event.Event]) -> None:
+        """Chuyển sự kiện cho màn hình, gộp các MOUSEMOTION liên tiếp thành vị trí mới nhất."""
+        pending_motion: Optional[pygame.event.Event] = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                pending_motion = event
+                continue
+            if pending_motion is not None:
+                self._dispatch(pending_motion)
+                pending_motion = None
+            self._dispatch(event)
+        if pending_motion is not None:
+            self._dispatch(pending_motion)
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def _dispatch(self, event: pygame.event.Event) -> None:
+        if self.recorder is not None:
+            self.recorder.record(event, self.get_ticks())
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif self.active_screen is None:
+            return
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.active_screen.invalidate()
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            # Bật/tắt overlay đo hiệu năng; vẽ lại toàn màn hình để xóa overlay cũ
+            self.profiler.toggle_overlay()
+            self.active_screen.invalidate()
+        else:
+            self.active_screen.handle_event(event)
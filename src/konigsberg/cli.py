@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m konigsberg", description="Mô phỏng Bảy cây cầu ở Königsberg.")
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Ghi thống kê thời gian từng pha của frame ra tệp JSON khi thoát (F3 để xem overlay).",
+    )
+    parser.add_argument(
+        "--map",
+        metavar="PATH",
+        help="Tệp bản đồ JSON (vùng đất, hình, điểm neo, cặp được phép nối); mặc định là Königsberg.",
+    )
+    parser.add_argument(
+        "--session",
+        metavar="PATH",
+        help="Tệp nhật ký phiên: khôi phục các cầu đã xây khi mở và tự động lưu mọi thao tác.",
+    )
+    parser.add_argument(
+        "--startup-trace",
+        action="store_true",
+        help="In thời gian tới frame đầu tiên theo từng pha (import, init, font, first_draw) ra stderr.",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Ghi mọi thao tác chuột/phím kèm thời điểm ra tệp nhị phân để phát lại bằng lệnh `replay`.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    analyze = subparsers.add_parser(
+        "analyze",
+        help="Phân tích hàng loạt cấu hình cầu (JSON Lines) mà không mở cửa sổ.",
+        description=(
+            "Mỗi dòng đầu vào là một danh sách cặp ID điểm neo, ví dụ "
+            '[["north_0", "kneiphof_4"], ["kneiphof_9", "lomse_9"]]. '
+            "Mỗi dòng đầu ra là một đối tượng JSON với kết luận Euler, bậc các đỉnh và đường đi."
+        ),
+    )
+    analyze.add_argument("input", nargs="?", default="-", help="Tệp JSON Lines (mặc định: stdin).")
+    analyze.add_argument("-o", "--output", default="-", help="Tệp kết quả (mặc định: stdout).")
+    analyze.add_argument("-j", "--workers", type=int, default=1, help="Số tiến trình xử lý song song (0 = số CPU).")
+    analyze.add_argument("--chunk-size", type=int, default=512, help="Số dòng mỗi khối gửi cho một tiến trình.")
+    analyze.add_argument("--no-path", action="store_true", help="Không tính đường đi/chu trình Euler.")
+
+    subparsers.add_parser(
+        "precompute",
+        help="Tính trước bảng phân loại mọi cấu hình cầu (2^19) vào thư mục cache.",
+    )
+    replay = subparsers.add_parser(
+        "replay",
+        help="Phát lại tệp ghi thao tác (--record) không cần màn hình, nhanh nhất có thể.",
+        description="In ra một đối tượng JSON: số sự kiện, số frame, thời gian chạy và danh sách cầu cuối cùng.",
+    )
+    replay.add_argument("recording", help="Tệp ghi thao tác.")
+    replay.add_argument("--map", dest="replay_map", metavar="PATH", help="Tệp bản đồ đã dùng khi ghi (mặc định: Königsberg).")
+    replay.add_argument("--no-render", action="store_true", help="Chỉ xử lý sự kiện, không vẽ frame (trừ frame đầu tiên để tính bố cục).")
+    return parser
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    from .analysis.batch import iter_results
+
+    workers = args.workers or os.cpu_count() or 1
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for line in iter_results(source, workers=workers, chunk_size=args.chunk_size, include_path=not args.no_path):
+            target.write(line)
+            target.write("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+def run_precompute(args: argparse.Namespace) -> int:  # noqa: ARG001
+    from .analysis.config_table import write_table
+
+    try:
+        print(write_table())
+    except OSError as exc:
+        print(f"Không ghi được bảng phân loại vào thư mục cache: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_replay(args: argparse.Namespace) -> int:
+    import json
+
+    from .recording import replay
+
+    summary = replay(args.recording, map_path=args.replay_map or args.map, profile_path=args.profile, render=not args.no_render)
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0
+
+
+def run_app(args: argparse.Namespace) -> int:
+    from .startup import startup_trace
+
+    if args.startup_trace:
+        startup_trace.enabled = True
+    # Pygame và toàn bộ giao diện chỉ được nạp khi thật sự mở cửa sổ (không nạp cho analyze/precompute)
+    with startup_trace.phase("import"):
+        from .app import App
+
+    from .session import SessionError
+
+    # Quản lý vòng đời Pygame bằng context manager để đảm bảo giải phóng tài nguyên.
+    try:
+        with App(profile_path=args.profile, map_path=args.map, session_path=args.session, record_path=args.record) as app:
+            app.run()
+    except SessionError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "analyze":
+        return run_analyze(args)
+    if args.command == "precompute":
+        return run_precompute(args)
+    if args.command == "replay":
+        return run_replay(args)
+    return run_app(args)
@@ -0,0 +1,169 @@
+"""Bộ giải Euler độc lập cho đa đồ thị vô hướng lớn (hàng triệu cạnh).
+
+Đồ thị được lưu dạng CSR trên mảng NumPy: mỗi cạnh u-v xuất hiện hai lần (u -> v và v -> u, khuyên
+u-u xuất hiện hai lần trong danh sách của u) cùng một ID cạnh. Kiểm tra bậc chẵn/lẻ và liên thông được
+vector hóa; thuật toán Hierholzer chạy lặp (không đệ quy) trên các memoryview của mảng, không tạo đối
+tượng Python cho từng cạnh, và trả đường đi dưới dạng generator lười.
+
+Module này nạp NumPy ngay khi import; các nơi dùng trong giao diện chỉ import nó khi cần tính đường đi.
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+# Các kết luận (trùng giá trị với analysis.engine, nhưng đỉnh cô lập không làm đồ thị mất liên thông)
+EMPTY = "empty"
+DISCONNECTED = "disconnected"
+CIRCUIT = "circuit"
+PATH = "path"
+NONE = "none"
+
+
+class CSRGraph(NamedTuple):
+    """Đa đồ thị vô hướng dạng CSR: danh sách kề của đỉnh v là `targets[indptr[v]:indptr[v + 1]]`."""
+
+    indptr: np.ndarray  # int64, độ dài node_count + 1
+    targets: np.ndarray  # int32, đỉnh đầu kia của mỗi nửa cạnh
+    edge_ids: np.ndarray  # int32, ID cạnh của mỗi nửa cạnh
+    edge_count: int
+
+    @property
+    def node_count(self) -> int:
+        return len(self.indptr) - 1
+
+    def degrees(self) -> np.ndarray:
+        """Bậc của từng đỉnh (khuyên tính 2)."""
+        return np.diff(self.indptr)
+
+
+def build_csr(node_count: int, us: Sequence[int] | np.ndarray, vs: Sequence[int] | np.ndarray) -> CSRGraph:
+    """Dựng đồ thị CSR từ hai mảng đầu mút cạnh (cạnh thứ i là us[i]-vs[i])."""
+    us = np.asarray(us, dtype=np.int64)
+    vs = np.asarray(vs, dtype=np.int64)
+    if us.shape != vs.shape or us.ndim != 1:
+        raise ValueError("Hai mảng đầu mút cạnh phải là mảng một chiều cùng độ dài")
+    edge_count = int(us.size)
+    if edge_count and (min(us.min(), vs.min()) < 0 or max(us.max(), vs.max()) >= node_count):
+        raise ValueError("Đầu mút cạnh nằm ngoài khoảng đỉnh")
+
+    sources = np.concatenate((us, vs))
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+    targets = np.concatenate((vs, us))[order].astype(np.int32)
+    edge_ids = (order % edge_count if edge_count else order).astype(np.int32)
+    return CSRGraph(indptr, targets, edge_ids, edge_count)
+
+
+def from_pair_counts(node_count: int, pair_counts: Iterable[Tuple[int, int, int]]) -> CSRGraph:
+    """Dựng đồ thị từ các bộ (u, v, số cạnh song song); cạnh song song được nhân bản bằng np.repeat."""
+    triples = np.array(list(pair_counts), dtype=np.int64).reshape(-1, 3)
+    counts = triples[:, 2]
+    return build_csr(node_count, np.repeat(triples[:, 0], counts), np.repeat(triples[:, 1], counts))
+
+
+def _reachable(graph: CSRGraph, start: int) -> np.ndarray:
+    """Mặt nạ các đỉnh đến được từ `start` (BFS theo từng lớp, mỗi lớp là vài phép toán mảng)."""
+    indptr, targets = graph.indptr, graph.targets
+    visited = np.zeros(graph.node_count, dtype=bool)
+    visited[start] = True
+    frontier = np.array([start], dtype=np.int64)
+    while frontier.size:
+        begins = indptr[frontier]
+        counts = indptr[frontier + 1] - begins
+        total = int(counts.sum())
+        if total == 0:
+            break
+        # Chỉ số của mọi nửa cạnh xuất phát từ lớp hiện tại
+        offsets = np.repeat(begins - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        neighbors = np.unique(targets[offsets + np.arange(total)])
+        frontier = neighbors[~visited[neighbors]]
+        visited[frontier] = True
+    return visited
+
+
+def is_connected(graph: CSRGraph) -> bool:
+    """Các đỉnh có cạnh có nằm trong cùng một thành phần liên thông không (bỏ qua đỉnh cô lập)."""
+    active = graph.degrees() > 0
+    if not active.any():
+        return True
+    reached = _reachable(graph, int(np.argmax(active)))
+    return not np.any(active & ~reached)
+
+
+def classify(graph: CSRGraph) -> str:
+    """Kết luận Euler của đồ thị: EMPTY, DISCONNECTED, CIRCUIT, PATH hoặc NONE."""
+    if graph.edge_count == 0:
+        return EMPTY
+    if not is_connected(graph):
+        return DISCONNECTED
+    odd_count = int(np.count_nonzero(graph.degrees() & 1))
+    if odd_count == 0:
+        return CIRCUIT
+    if odd_count == 2:
+        return PATH
+    return NONE
+
+
+def euler_walk(graph: CSRGraph, start: int | None = None) -> Iterator[int]:
+    """Generator lười các đỉnh của chu trình/đường đi Euler (edge_count + 1 đỉnh).
+
+    `start` là đỉnh bắt đầu mong muốn; với đường đi nó phải là một trong hai đỉnh bậc lẻ.
+    Mặc định: đỉnh có cạnh nhỏ nhất (chu trình) hoặc đỉnh bậc lẻ nhỏ nhất (đường đi).
+    Kiểm tra được thực hiện ngay khi gọi hàm; ValueError nếu đồ thị không có đường đi Euler.
+    """
+    verdict = classify(graph)
+    if verdict == EMPTY:
+        return iter(())
+    if verdict not in (CIRCUIT, PATH):
+        raise ValueError(f"Đồ thị không có đường đi Euler ({verdict})")
+
+    degrees = graph.degrees()
+    if verdict == CIRCUIT:
+        if start is None:
+            start = int(np.argmax(degrees > 0))
+        elif degrees[start] == 0:
+            raise ValueError(f"Đỉnh {start} không có cạnh nào")
+        origin = start
+    else:
+        odd = [int(node) for node in np.flatnonzero(degrees & 1)]
+        if start is None:
+            start = odd[0]
+        elif start not in odd:
+            raise ValueError(f"Đường đi Euler phải bắt đầu ở một đỉnh bậc lẻ {odd}, không phải {start}")
+        # Hierholzer lặp trả đỉnh theo thứ tự ngược: xuất phát từ đầu kia để đường đi bắt đầu ở `start`
+        origin = odd[1] if start == odd[0] else odd[0]
+    return _hierholzer(graph, origin)
+
+
+def _hierholzer(graph: CSRGraph, origin: int) -> Iterator[int]:
+    # Con trỏ tới nửa cạnh chưa xét tiếp theo của mỗi đỉnh; cạnh đã đi được đánh dấu theo ID
+    cursor = memoryview(graph.indptr[:-1].copy())
+    stop = memoryview(graph.indptr[1:].copy())
+    targets = memoryview(graph.targets)
+    edge_ids = memoryview(graph.edge_ids)
+    used = bytearray(graph.edge_count)
+    stack = array("q", [origin])
+    while stack:
+        node = stack[-1]
+        slot = cursor[node]
+        end = stop[node]
+        while slot < end and used[edge_ids[slot]]:
+            slot += 1
+        if slot < end:
+            used[edge_ids[slot]] = 1
+            cursor[node] = slot + 1
+            stack.append(targets[slot])
+        else:
+            cursor[node] = slot
+            yield stack.pop()
+
+
+def walk_labels(labels: Sequence[str], pair_counts: Iterable[Tuple[str, str, int]], start: str | None = None) -> List[str]:
+    """Đường đi Euler theo nhãn đỉnh cho đồ thị cho dưới dạng (u, v, số cạnh) (tiện dùng cho giao diện)."""
+    index = {label: i for i, label in enumerate(labels)}
+    graph = from_pair_counts(len(labels), ((index[u], index[v], count) for u, v, count in pair_counts))
+    return [labels[node] for node in euler_walk(graph, None if start is None else index[start])]
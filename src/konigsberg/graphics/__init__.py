@@ -1,5 +1,6 @@
 from .konigsberg_map import KonigsbergMap
 from .bridge_anchor import BridgeAnchor, BridgeAnchorManager
 from .graph_nodes import GraphNode, GraphNodeManager
+from .spatial_index import UniformGrid
 
-__all__ = ["KonigsbergMap", "BridgeAnchor", "BridgeAnchorManager", "GraphNode", "GraphNodeManager"]
+__all__ = ["KonigsbergMap", "BridgeAnchor", "BridgeAnchorManager", "GraphNode", "GraphNodeManager", "UniformGrid"]
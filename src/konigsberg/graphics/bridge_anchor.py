@@ -1,13 +1,27 @@
 from __future__ import annotations
 
-import pygame
-from typing import Tuple, List, NamedTuple
+from array import array
 from dataclasses import dataclass
+from typing import AbstractSet, Tuple, List
+
+import pygame
+
+from ..maps import CompiledMap, default_map
+from .spatial_index import UniformGrid
 
+# Kiểu vẽ điểm neo theo trạng thái: (bán kính, độ dày viền, màu viền)
+NORMAL_STYLE = (5, 2, (0, 0, 0))
+HIGHLIGHT_STYLE = (8, 3, (255, 215, 0))  # To ra và viền vàng khi được highlight
+DEFAULT_ANCHOR_COLOR = (128, 128, 128)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class BridgeAnchor:
-    """Điểm neo cầu trên mép vùng đất."""
+    """Điểm neo cầu trên mép vùng đất.
+
+    Đối tượng được tạo một lần và giữ nguyên danh tính; khi bố cục thay đổi chỉ
+    tọa độ x/y được cập nhật tại chỗ, nên các tham chiếu trong danh sách cầu vẫn hợp lệ.
+    """
     
     id: str  # ID duy nhất, ví dụ: "north_1", "kneiphof_3"
     x: float  # tọa độ x
@@ -32,248 +46,144 @@ class BridgeAnchor:
 
 
 class BridgeAnchorManager:
-    """Quản lý tất cả các điểm neo cầu trong bản đồ Königsberg."""
+    """Quản lý tất cả các điểm neo cầu của bản đồ.
+
+    Vị trí chuẩn hóa của điểm neo lấy từ bản đồ đã biên dịch (mặc định: Königsberg).
+    Dữ liệu điểm neo được lưu dạng struct-of-arrays (`xs`, `ys`, `region_codes`, `indices`)
+    và chỉ được tính lại khi rect bản đồ thay đổi.
+    """
     
-    def __init__(self) -> None:
-        self.anchors: List[BridgeAnchor] = []
-        
-        # Màu sắc cho từng vùng
+    def __init__(self, map_definition: CompiledMap | None = None) -> None:
+        map_definition = map_definition or default_map()
+        templates = map_definition.anchors
+        
+        # Mã số của từng vùng trong kho điểm neo dạng mảng
+        self.regions: Tuple[str, ...] = map_definition.region_ids
+        region_codes = {region: code for code, region in enumerate(self.regions)}
+        
+        # Mẫu bố cục chuẩn hóa
+        self._fx = array("d", (t.fx for t in templates))
+        self._fy = array("d", (t.fy for t in templates))
+        
+        # Kho điểm neo dạng mảng
+        self.xs = array("d", bytes(8 * len(templates)))
+        self.ys = array("d", bytes(8 * len(templates)))
+        self.region_codes = array("H", (region_codes[t.region] for t in templates))
+        self.indices = array("H", (t.index for t in templates))
+        
+        # Các đối tượng BridgeAnchor được tạo một lần, giữ nguyên danh tính
+        self.anchors: List[BridgeAnchor] = [
+            BridgeAnchor(id=f"{t.region}_{t.index}", x=0.0, y=0.0, region=t.region, index=t.index)
+            for t in templates
+        ]
+        self._anchors_by_id = {anchor.id: anchor for anchor in self.anchors}
+        self._slots_by_id = {anchor.id: slot for slot, anchor in enumerate(self.anchors)}
+        
+        # Rect của bố cục hiện tại; tăng layout_version mỗi khi bố cục được tính lại
+        self._layout_rect: pygame.Rect | None = None
+        self.layout_version = 0
+        
+        # Lưới không gian cho hit-test; phần tử là vị trí (slot) của điểm neo trong kho
+        self.hit_radius = 6
+        self._grid = UniformGrid()
+        
+        # Màu sắc cho từng vùng (vùng không khai báo màu được vẽ màu xám)
         self.region_colors = {
-            "north": (255, 100, 100),    # đỏ nhạt
-            "south": (100, 100, 255),    # xanh dương nhạt
-            "kneiphof": (100, 255, 100), # xanh lá nhạt
-            "lomse": (255, 255, 100),    # vàng nhạt
+            region.id: region.anchor_color
+            for region in map_definition.regions
+            if region.anchor_color is not None
         }
         
-    def generate_anchors(self, rect: pygame.Rect) -> None:
-        """Tạo điểm neo cho các vùng đất: North (8), South (8), Kneiphof (11), Lomse (11) - tổng 38 điểm."""
-        self.anchors.clear()
-        
-        # Vùng phía bắc - 8 điểm dọc theo mép dưới
-        self._create_north_anchors(rect)
-        
-        # Vùng phía nam - 8 điểm dọc theo mép trên
-        self._create_south_anchors(rect)
-        
-        # Đảo Kneiphof - 11 điểm xung quanh
-        self._create_kneiphof_anchors(rect)
-        
-        # Đảo Lomse - 11 điểm xung quanh
-        self._create_lomse_anchors(rect)
-    
-    def _create_north_anchors(self, rect: pygame.Rect) -> None:
-        """Tạo 8 điểm neo cho vùng phía bắc: 4 điểm trái (thiên về Kneiphof), 4 điểm phải (thiên về Lomse)."""
-        y = rect.y + rect.height * 0.25  # dịch lên gần mép hơn (từ 0.28 về 0.25)
+        # Atlas sprite: mỗi ô là một điểm neo vẽ sẵn theo (vùng, trạng thái); dựng khi vẽ lần đầu
+        self._atlas: pygame.Surface | None = None
+        self._cell_size = 2 * (HIGHLIGHT_STYLE[0] + 1)
+        # Danh sách blit của mọi điểm neo ở trạng thái thường, dựng lại khi bố cục thay đổi
+        self._blit_sequence: List[tuple] = []
+        self._blit_layout = -1
         
-        # 4 điểm bên trái thiên về đảo Kneiphof - thưa ra hơn (x = 0.28 đến 0.44)
-        left_start = rect.x + rect.width * 0.28  # dịch về mép trái hơn
-        left_end = rect.x + rect.width * 0.44    # mở rộng khoảng cách
-        for i in range(4):
-            x = left_start + (left_end - left_start) * i / 3
-            anchor = BridgeAnchor(
-                id=f"north_{i}",
-                x=x,
-                y=y,
-                region="north",
-                index=i
-            )
-            self.anchors.append(anchor)
-        
-        # 4 điểm bên phải thiên về đảo Lomse - dịch sang phải hơn (x = 0.66 đến 0.82)
-        right_start = rect.x + rect.width * 0.66  # dịch sang phải hơn
-        right_end = rect.x + rect.width * 0.82    # dịch về mép phải hơn nữa
-        for i in range(4):
-            x = right_start + (right_end - right_start) * i / 3
-            anchor = BridgeAnchor(
-                id=f"north_{4 + i}",
-                x=x,
-                y=y,
-                region="north",
-                index=4 + i
-            )
-            self.anchors.append(anchor)
+    def generate_anchors(self, rect: pygame.Rect) -> None:
+        """Tính vị trí điểm neo cho rect; bỏ qua nếu bố cục không đổi."""
+        if self._layout_rect == rect:
+            return
+        
+        ox, oy, width, height = rect.x, rect.y, rect.width, rect.height
+        self.xs = array("d", [ox + width * fx for fx in self._fx])
+        self.ys = array("d", [oy + height * fy for fy in self._fy])
+        
+        # Cập nhật tại chỗ để các tham chiếu đến điểm neo (cầu, highlight) vẫn đúng
+        for anchor, x, y in zip(self.anchors, self.xs, self.ys):
+            anchor.x = x
+            anchor.y = y
+        
+        # Dựng lại lưới hit-test theo bố cục mới
+        self._grid.clear()
+        r = self.hit_radius
+        for slot, (x, y) in enumerate(zip(self.xs, self.ys)):
+            self._grid.insert(slot, (x - r, y - r, x + r, y + r))
+        
+        self._layout_rect = pygame.Rect(rect)
+        self.layout_version += 1
     
-    def _create_south_anchors(self, rect: pygame.Rect) -> None:
-        """Tạo 8 điểm neo cho vùng phía nam: 4 điểm trái (thiên về Kneiphof), 4 điểm phải (thiên về Lomse)."""
-        y = rect.y + rect.height * 0.75  # dịch xuống gần mép hơn (từ 0.72 về 0.75)
-        
-        # 4 điểm bên trái thiên về đảo Kneiphof - thưa ra hơn (x = 0.28 đến 0.44)
-        left_start = rect.x + rect.width * 0.28  # dịch về mép trái hơn
-        left_end = rect.x + rect.width * 0.44    # mở rộng khoảng cách
-        for i in range(4):
-            x = left_start + (left_end - left_start) * i / 3
-            anchor = BridgeAnchor(
-                id=f"south_{i}",
-                x=x,
-                y=y,
-                region="south",
-                index=i
-            )
-            self.anchors.append(anchor)
-        
-        # 4 điểm bên phải thiên về đảo Lomse - dịch sang phải hơn (x = 0.66 đến 0.82)
-        right_start = rect.x + rect.width * 0.66  # dịch sang phải hơn
-        right_end = rect.x + rect.width * 0.82    # dịch về mép phải hơn nữa
-        for i in range(4):
-            x = right_start + (right_end - right_start) * i / 3
-            anchor = BridgeAnchor(
-                id=f"south_{4 + i}",
-                x=x,
-                y=y,
-                region="south",
-                index=4 + i
-            )
-            self.anchors.append(anchor)
+    def draw_anchors(self, surface: pygame.Surface, highlighted_ids: AbstractSet[str] = frozenset()) -> None:
+        """Vẽ tất cả các điểm neo lên surface bằng một lần `Surface.blits` từ atlas sprite.
+
+        `highlighted_ids` là tập ID các điểm neo được highlight; chỉ các ô tương ứng trong danh sách
+        blit được thay bằng sprite highlight, thứ tự vẽ (điểm neo sau đè điểm neo trước) giữ nguyên.
+        """
+        if self._atlas is None:
+            self._atlas = self._render_atlas()
+        if self._blit_layout != self.layout_version:
+            self._blit_sequence = self._build_blit_sequence()
+            self._blit_layout = self.layout_version
+        
+        sequence = self._blit_sequence
+        if highlighted_ids:
+            sequence = list(sequence)
+            for anchor_id in highlighted_ids:
+                slot = self._slots_by_id.get(anchor_id)
+                if slot is not None:
+                    sequence[slot] = self._blit_entry(slot, highlighted=True)
+        surface.blits(sequence, doreturn=False)
     
-    def _create_kneiphof_anchors(self, rect: pygame.Rect) -> None:
-        """Tạo 11 điểm neo cho đảo Kneiphof: 4 điểm trên, 4 điểm dưới, 3 điểm phải (về phía Lomse)."""
-        center_x = rect.x + rect.width * 0.35
-        center_y = rect.y + rect.height * 0.5
-        width = rect.width * 0.35
-        height = rect.height * 0.35
-        
-        import math
-        
-        # 4 điểm lệch trên (từ góc 70° đến 110°)
-        for i in range(4):
-            angle = math.radians(70 + i * 13.33)  # từ 70° đến 110°
-            x = center_x + (width / 2) * 0.9 * math.cos(angle)
-            y = center_y + (height / 2) * 0.9 * math.sin(angle)
-            
-            anchor = BridgeAnchor(
-                id=f"kneiphof_{i}",
-                x=x,
-                y=y,
-                region="kneiphof",
-                index=i
-            )
-            self.anchors.append(anchor)
-        
-        # 4 điểm lệch dưới (từ góc 250° đến 290°)
-        for i in range(4):
-            angle = math.radians(250 + i * 13.33)  # từ 250° đến 290°
-            x = center_x + (width / 2) * 0.9 * math.cos(angle)
-            y = center_y + (height / 2) * 0.9 * math.sin(angle)
-            
-            anchor = BridgeAnchor(
-                id=f"kneiphof_{4 + i}",
-                x=x,
-                y=y,
-                region="kneiphof",
-                index=4 + i
-            )
-            self.anchors.append(anchor)
-        
-        # 3 điểm lệch về phía đảo Lomse (từ góc -20° đến 20°)
-        for i in range(3):
-            angle = math.radians(-20 + i * 20)  # từ -20° đến 20°
-            x = center_x + (width / 2) * 0.9 * math.cos(angle)
-            y = center_y + (height / 2) * 0.9 * math.sin(angle)
-            
-            anchor = BridgeAnchor(
-                id=f"kneiphof_{8 + i}",
-                x=x,
-                y=y,
-                region="kneiphof",
-                index=8 + i
-            )
-            self.anchors.append(anchor)
+    def _render_atlas(self) -> pygame.Surface:
+        """Vẽ sẵn điểm neo của từng vùng (hàng) ở trạng thái thường và highlight (cột)."""
+        cell = self._cell_size
+        atlas = pygame.Surface((2 * cell, max(1, len(self.regions)) * cell), pygame.SRCALPHA)
+        center = cell // 2
+        for row, region in enumerate(self.regions):
+            color = self.region_colors.get(region, DEFAULT_ANCHOR_COLOR)
+            for column, (radius, border_width, border_color) in enumerate((NORMAL_STYLE, HIGHLIGHT_STYLE)):
+                position = (column * cell + center, row * cell + center)
+                pygame.draw.circle(atlas, color, position, radius)
+                pygame.draw.circle(atlas, border_color, position, radius, border_width)
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        return atlas
     
-    def _create_lomse_anchors(self, rect: pygame.Rect) -> None:
-        """Tạo 11 điểm neo cho đảo Lomse: 4 điểm trên, 4 điểm dưới, 3 điểm trái (về phía Kneiphof)."""
-        center_x = rect.x + rect.width * 0.75
-        center_y = rect.y + rect.height * 0.5
-        width = rect.width * 0.35
-        height = rect.height * 0.35
-        
-        import math
-        
-        # 4 điểm lệch trên (từ góc 70° đến 110°)
-        for i in range(4):
-            angle = math.radians(70 + i * 13.33)  # từ 70° đến 110°
-            x = center_x + (width / 2) * 0.9 * math.cos(angle)
-            y = center_y + (height / 2) * 0.9 * math.sin(angle)
-            
-            anchor = BridgeAnchor(
-                id=f"lomse_{i}",
-                x=x,
-                y=y,
-                region="lomse",
-                index=i
-            )
-            self.anchors.append(anchor)
-        
-        # 4 điểm lệch dưới (từ góc 250° đến 290°)
-        for i in range(4):
-            angle = math.radians(250 + i * 13.33)  # từ 250° đến 290°
-            x = center_x + (width / 2) * 0.9 * math.cos(angle)
-            y = center_y + (height / 2) * 0.9 * math.sin(angle)
-            
-            anchor = BridgeAnchor(
-                id=f"lomse_{4 + i}",
-                x=x,
-                y=y,
-                region="lomse",
-                index=4 + i
-            )
-            self.anchors.append(anchor)
-        
-        # 3 điểm lệch về phía đảo Kneiphof (từ góc 160° đến 200°)
-        for i in range(3):
-            angle = math.radians(160 + i * 20)  # từ 160° đến 200°
-            x = center_x + (width / 2) * 0.9 * math.cos(angle)
-            y = center_y + (height / 2) * 0.9 * math.sin(angle)
-            
-            anchor = BridgeAnchor(
-                id=f"lomse_{8 + i}",
-                x=x,
-                y=y,
-                region="lomse",
-                index=8 + i
-            )
-            self.anchors.append(anchor)
+    def _blit_entry(self, slot: int, highlighted: bool = False) -> tuple:
+        """Bộ (atlas, vị trí đích, ô nguồn) để blit điểm neo ở vị trí `slot`."""
+        cell = self._cell_size
+        center = cell // 2
+        area = pygame.Rect(cell if highlighted else 0, self.region_codes[slot] * cell, cell, cell)
+        return (self._atlas, (int(self.xs[slot]) - center, int(self.ys[slot]) - center), area)
     
-    def draw_anchors(self, surface: pygame.Surface, highlighted_anchors: list = None) -> None:
-        """Vẽ tất cả các điểm neo lên surface."""
-        if highlighted_anchors is None:
-            highlighted_anchors = []
-            
-        # Khởi tạo font để vẽ tên điểm
-        if not hasattr(self, 'font'):
-            try:
-                self.font = pygame.font.SysFont("arial", 10)
-            except:
-                self.font = pygame.font.Font(None, 12)
-            
-        for anchor in self.anchors:
-            color = self.region_colors.get(anchor.region, (128, 128, 128))
-            
-            # Kiểm tra xem anchor có được highlight không
-            is_highlighted = anchor in highlighted_anchors
-            radius = 8 if is_highlighted else 5  # To ra khi được highlight
-            border_width = 3 if is_highlighted else 2
-            
-            # Vẽ điểm neo như hình tròn nhỏ
-            pygame.draw.circle(surface, color, (int(anchor.x), int(anchor.y)), radius)
-            
-            # Vẽ viền đen (hoặc vàng nếu highlighted)
-            border_color = (255, 215, 0) if is_highlighted else (0, 0, 0)  # Vàng khi highlight
-            pygame.draw.circle(surface, border_color, (int(anchor.x), int(anchor.y)), radius, border_width)
-            
+    def _build_blit_sequence(self) -> List[tuple]:
+        return [self._blit_entry(slot) for slot in range(len(self.anchors))]
     
     def get_anchor_by_id(self, anchor_id: str) -> BridgeAnchor | None:
         """Lấy điểm neo theo ID."""
-        for anchor in self.anchors:
-            if anchor.id == anchor_id:
-                return anchor
-        return None
+        return self._anchors_by_id.get(anchor_id)
     
     def get_anchor_at_point(self, point: Tuple[float, float]) -> BridgeAnchor | None:
-        """Lấy điểm neo tại vị trí được click."""
-        for anchor in self.anchors:
-            if anchor.contains_point(point):
-                return anchor
-        return None
+        """Lấy điểm neo tại vị trí được click (tra lưới không gian, chỉ xét các điểm lân cận)."""
+        candidates = [
+            slot for slot in self._grid.query(point, self.hit_radius)
+            if self.anchors[slot].contains_point(point, self.hit_radius)
+        ]
+        if not candidates:
+            return None
+        # Giữ thứ tự ưu tiên như khi duyệt tuần tự: điểm neo đứng trước thắng
+        return self.anchors[min(candidates)]
     
     def get_anchors_by_region(self, region: str) -> List[BridgeAnchor]:
         """Lấy tất cả điểm neo của một vùng."""
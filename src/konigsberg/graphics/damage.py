@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import List
+
+import pygame
+
+
+class DamageTracker:
+    """Thu thập các vùng màn hình đã thay đổi trong một frame.
+
+    Các thành phần gọi `add(rect)` cho phần chúng vẽ khác đi so với frame trước,
+    hoặc `add_full()` khi bố cục thay đổi. Vòng lặp chính gọi `consume()` để lấy
+    danh sách rect đã gộp cho `pygame.display.update` (None nghĩa là cần flip toàn màn hình).
+    """
+
+    def __init__(self) -> None:
+        self._rects: List[pygame.Rect] = []
+        self._full = True  # frame đầu tiên luôn vẽ toàn bộ
+
+    def add(self, rect: pygame.Rect) -> None:
+        """Đánh dấu một vùng đã thay đổi."""
+        if not self._full and rect.width > 0 and rect.height > 0:
+            self._rects.append(pygame.Rect(rect))
+
+    def add_full(self) -> None:
+        """Đánh dấu toàn màn hình cần cập nhật."""
+        self._full = True
+        self._rects.clear()
+
+    def consume(self) -> List[pygame.Rect] | None:
+        """Trả về danh sách vùng đã gộp (hoặc None nếu cần flip) và đặt lại trạng thái."""
+        if self._full:
+            self._full = False
+            return None
+        rects = merge_rects(self._rects)
+        self._rects = []
+        return rects
+
+
+def merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """Gộp các rect chồng lên nhau cho tới khi không còn cặp nào giao nhau."""
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        current = pygame.Rect(rect)
+        # Hợp nhất lặp lại vì rect mới có thể nối liền nhiều rect đã gộp
+        index = current.collidelist(merged)
+        while index != -1:
+            current.union_ip(merged.pop(index))
+            index = current.collidelist(merged)
+        merged.append(current)
+    return merged
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import List, Tuple
+
+Point = Tuple[float, float]
+
+
+@lru_cache(maxsize=8)
+def bezier_basis(steps: int) -> Tuple[Tuple[float, float, float], ...]:
+    """Hệ số Bernstein ((1-t)², 2t(1-t), t²) của Bezier bậc 2 tại steps + 1 giá trị t đều nhau."""
+    basis = []
+    for step in range(steps + 1):
+        t = step / steps
+        basis.append(((1 - t) * (1 - t), 2 * t * (1 - t), t * t))
+    return tuple(basis)
+
+
+def edge_polylines(
+    center_u: Point,
+    radius_u: float,
+    center_v: Point,
+    radius_v: float,
+    edge_count: int,
+    spacing: float = 8.0,
+    steps: int = 20,
+) -> List[List[Point]]:
+    """Tính đường vẽ của tất cả các cạnh song song giữa hai node, nối từ rìa node.
+
+    Một cạnh: một đoạn thẳng (2 điểm). Nhiều cạnh: mỗi cạnh là một đường cong Bezier bậc 2 gồm
+    steps + 1 điểm, có điểm điều khiển lệch dần theo vector pháp tuyến. Các điểm được tính trực tiếp
+    bằng tổ hợp tuyến tính với bảng hệ số Bernstein, không tạo đối tượng Vector2 trung gian.
+    """
+    ux, uy = center_u
+    vx, vy = center_v
+    dx, dy = vx - ux, vy - uy
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return []
+    dir_x, dir_y = dx / length, dy / length
+
+    if edge_count == 1:
+        # Điểm bắt đầu và kết thúc trên rìa của node
+        return [[(ux + dir_x * radius_u, uy + dir_y * radius_u), (vx - dir_x * radius_v, vy - dir_y * radius_v)]]
+
+    # Vector vuông góc để tạo độ cong (xoay hướng u->v 90°)
+    normal_x, normal_y = -dir_y, dir_x
+    mid_x, mid_y = (ux + vx) / 2, (uy + vy) / 2
+    basis = bezier_basis(steps)
+
+    polylines = []
+    for i in range(edge_count):
+        # Điểm control cho đường cong Bezier (điểm giữa được dịch chuyển)
+        offset = (i - (edge_count - 1) / 2.0) * spacing * 2.5
+        cx, cy = mid_x + normal_x * offset, mid_y + normal_y * offset
+
+        # Hướng từ tâm node đến điểm control để tính điểm trên rìa
+        su_x, su_y = cx - ux, cy - uy
+        su_len = math.hypot(su_x, su_y)
+        ev_x, ev_y = cx - vx, cy - vy
+        ev_len = math.hypot(ev_x, ev_y)
+        sx, sy = ux + su_x / su_len * radius_u, uy + su_y / su_len * radius_u
+        ex, ey = vx + ev_x / ev_len * radius_v, vy + ev_y / ev_len * radius_v
+
+        polylines.append([
+            (a * sx + b * cx + c * ex, a * sy + b * cy + c * ey)
+            for a, b, c in basis
+        ])
+    return polylines
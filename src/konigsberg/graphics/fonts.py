@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Sequence, Tuple, Union
+
+import pygame
+
+from ..startup import startup_trace
+
+FONT_CACHE_VERSION = 1
+
+# None = font mặc định đi kèm Pygame (không cần tìm trong hệ thống)
+Families = Union[str, Sequence[str], None]
+
+
+class FontRegistry:
+    """Kho font dùng chung: mỗi (tệp font, cỡ chữ) chỉ tạo một `pygame.font.Font`.
+
+    Tên họ font được phân giải thành đường dẫn tệp bằng `pygame.font.match_font` đúng một lần;
+    kết quả (kể cả "không tìm thấy") được lưu vào một tệp JSON nhỏ trong thư mục cache, nên các lần
+    chạy sau không phải quét danh sách font hệ thống (chậm trên Linux vì phải gọi `fc-list`).
+    Đường dẫn đã lưu nhưng tệp không còn tồn tại sẽ được phân giải lại.
+    """
+
+    def __init__(self, cache_path: Path | None = None) -> None:
+        self._cache_path = cache_path
+        self._paths: Dict[str, str | None] | None = None  # tên họ font -> đường dẫn (nạp khi cần)
+        self._fonts: Dict[Tuple[str | None, int], pygame.font.Font] = {}
+        self.resolved = 0  # số lần phải hỏi hệ thống (match_font)
+
+    def get(self, families: Families, size: int) -> pygame.font.Font:
+        """Font của họ đầu tiên có trong hệ thống (theo thứ tự ưu tiên); không có thì dùng font mặc định."""
+        if isinstance(families, str):
+            families = (families,)
+        path = None
+        for family in families or ():
+            path = self.resolve(family)
+            if path is not None:
+                break
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            with startup_trace.phase("font"):
+                if not pygame.font.get_init():
+                    pygame.font.init()
+                font = pygame.font.Font(path, size)
+            self._fonts[key] = font
+        return font
+
+    def resolve(self, family: str) -> str | None:
+        """Đường dẫn tệp font của một họ font, hoặc None nếu hệ thống không có."""
+        paths = self._load_paths()
+        if family in paths:
+            path = paths[family]
+            if path is None or Path(path).exists():
+                return path
+        with startup_trace.phase("font"):
+            path = pygame.font.match_font(family)
+        self.resolved += 1
+        paths[family] = path
+        self._save_paths()
+        return path
+
+    def _load_paths(self) -> Dict[str, str | None]:
+        if self._paths is None:
+            self._paths = {}
+            if self._cache_path is not None and self._cache_path.exists():
+                try:
+                    data = json.loads(self._cache_path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    data = {}  # tệp hỏng: phân giải lại từ đầu
+                if isinstance(data, dict) and data.get("version") == FONT_CACHE_VERSION:
+                    self._paths.update(data.get("fonts", {}))
+        return self._paths
+
+    def _save_paths(self) -> None:
+        if self._cache_path is None:
+            return
+        from ..paths import atomic_write_bytes
+
+        data = {"version": FONT_CACHE_VERSION, "fonts": self._paths}
+        try:
+            atomic_write_bytes(self._cache_path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+        except OSError:
+            pass  # chỉ là cache: lần sau sẽ phân giải lại
+
+    def clear(self) -> None:
+        """Bỏ các Font đang dùng chung (gọi trước khi tắt hệ con font); đường dẫn đã phân giải được giữ lại."""
+        self._fonts.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Số font đang dùng chung, số họ font đã biết và số lần phải tìm trong hệ thống."""
+        return {"fonts": len(self._fonts), "families": len(self._paths or {}), "resolved": self.resolved}
+
+
+_shared_registry: FontRegistry | None = None
+
+
+def get_font_registry() -> FontRegistry:
+    """Kho font dùng chung cho mọi thành phần giao diện (cache phân giải trong thư mục cache)."""
+    global _shared_registry
+    if _shared_registry is None:
+        from ..paths import cache_dir
+
+        try:
+            cache_path: Path | None = cache_dir() / "fonts.json"
+        except OSError:
+            cache_path = None  # không tạo được thư mục cache: chỉ giữ phân giải trong bộ nhớ
+        _shared_registry = FontRegistry(cache_path)
+    return _shared_registry
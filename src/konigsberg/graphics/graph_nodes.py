@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import math
 import pygame
 from typing import Tuple, List
 from dataclasses import dataclass
 
+from ..maps import CompiledMap, default_map
+from .fonts import get_font_registry
+from .text_cache import get_text_cache
+
 
 @dataclass
 class GraphNode:
@@ -32,9 +37,10 @@ class GraphNode:
 
 
 class GraphNodeManager:
-    """Quản lý 4 đỉnh đồ thị Königsberg ở panel bên phải."""
+    """Quản lý các đỉnh đồ thị (4 đỉnh với bản đồ Königsberg) ở panel bên phải."""
     
-    def __init__(self) -> None:
+    def __init__(self, map_definition: CompiledMap | None = None) -> None:
+        self.map_definition = map_definition or default_map()
         self.nodes: List[GraphNode] = []
         
         # Màu sắc
@@ -43,41 +49,39 @@ class GraphNodeManager:
         self.text_color = (0, 0, 0)  # đen
         self.selected_color = (255, 200, 200)  # đỏ nhạt khi được chọn
         
-        self.font = None  # sẽ được khởi tạo khi cần
+        self.font = get_font_registry().get(None, 36)  # dùng chung với nhãn vùng đất của bản đồ
         self.selected_node: GraphNode | None = None
         
+        # Rect của bố cục hiện tại; tăng layout_version mỗi khi node được tạo lại
+        self._layout_rect: pygame.Rect | None = None
+        self.layout_version = 0
+        
     def generate_nodes(self, panel_rect: pygame.Rect) -> None:
-        """Tạo 4 node trong vùng panel bên phải."""
+        """Tạo các node trong vùng panel bên phải; bỏ qua nếu bố cục không đổi."""
+        if self._layout_rect == panel_rect:
+            return
+        self._layout_rect = pygame.Rect(panel_rect)
+        self.layout_version += 1
         self.nodes.clear()
         
-        # Tạo font nếu chưa có
-        if self.font is None:
-            self.font = pygame.font.Font(None, 36)
-        
-        # Tính toán vị trí 4 node theo layout: 1 trên, 2-3 giữa, 4 dưới
+        # Vị trí node: offset (pixel) so với tâm panel như khai báo trong tệp bản đồ
+        # (Königsberg: 1 trên, 2-3 giữa, 4 dưới); node không khai báo được xếp đều trên một vòng tròn
         center_x = panel_rect.x + panel_rect.width // 2
         center_y = panel_rect.y + panel_rect.height // 2
+        definitions = self.map_definition.nodes
+        ring_radius = 0.4 * min(panel_rect.width, panel_rect.height)
         
-        offset_x = 80  # khoảng cách ngang giữa node 2 và 3 (tăng từ 50)
-        offset_y = 80  # khoảng cách dọc (tăng từ 55)
-        
-        # Vị trí các node theo layout mới
-        positions = [
-            (center_x, center_y - offset_y),        # Node 1 - ở trên (giữa)
-            (center_x - offset_x, center_y),        # Node 2 - ở giữa trái
-            (center_x + offset_x, center_y),        # Node 3 - ở giữa phải
-            (center_x, center_y + offset_y),        # Node 4 - ở dưới (giữa)
-        ]
-        
-        # Tạo 4 node tương ứng với 4 vùng đất
-        labels = ["1", "2", "3", "4"]  # 1=Bắc, 2=Kneiphof, 3=Nam, 4=Lomse
-        
-        for i, (x, y) in enumerate(positions):
+        for i, definition in enumerate(definitions):
+            if definition.offset is not None:
+                dx, dy = definition.offset
+            else:
+                angle = 2 * math.pi * i / len(definitions) - math.pi / 2
+                dx, dy = int(ring_radius * math.cos(angle)), int(ring_radius * math.sin(angle))
             node = GraphNode(
-                id=str(i + 1),
-                x=x,
-                y=y,
-                label=labels[i]
+                id=definition.id,
+                x=center_x + dx,
+                y=center_y + dy,
+                label=definition.label
             )
             self.nodes.append(node)
     
@@ -92,10 +96,9 @@ class GraphNodeManager:
             pygame.draw.circle(surface, self.node_border, (int(node.x), int(node.y)), node.radius, 3)
             
             # Vẽ label
-            if self.font:
-                text_surface = self.font.render(node.label, True, self.text_color)
-                text_rect = text_surface.get_rect(center=(int(node.x), int(node.y)))
-                surface.blit(text_surface, text_rect)
+            text_surface = get_text_cache().render(self.font, node.label, self.text_color)
+            text_rect = text_surface.get_rect(center=(int(node.x), int(node.y)))
+            surface.blit(text_surface, text_rect)
     
     def handle_click(self, point: Tuple[float, float]) -> GraphNode | None:
         """Xử lý click vào node và trả về node được click."""
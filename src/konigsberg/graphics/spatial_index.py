@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+Bounds = Tuple[float, float, float, float]  # (left, top, right, bottom)
+
+
+class UniformGrid:
+    """Chỉ mục không gian dạng lưới đều cho truy vấn điểm (hit-test).
+
+    Mỗi phần tử được đăng ký vào tất cả các ô mà hình chữ nhật bao của nó phủ lên.
+    Truy vấn một điểm chỉ xét các phần tử trong những ô quanh điểm đó thay vì duyệt toàn bộ.
+    Thêm/xóa phần tử là thao tác cục bộ, không cần dựng lại cả lưới.
+    """
+
+    def __init__(self, cell_size: float = 48.0) -> None:
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[Hashable]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _cell_range(self, bounds: Bounds) -> Iterator[Tuple[int, int]]:
+        """Liệt kê các ô bị phủ bởi hình chữ nhật bao."""
+        left, top, right, bottom = bounds
+        size = self.cell_size
+        for cx in range(int(left // size), int(right // size) + 1):
+            for cy in range(int(top // size), int(bottom // size) + 1):
+                yield cx, cy
+
+    def insert(self, item: Hashable, bounds: Bounds) -> None:
+        """Thêm phần tử với hình chữ nhật bao cho trước."""
+        for cell in self._cell_range(bounds):
+            self._cells.setdefault(cell, []).append(item)
+        self._count += 1
+
+    def remove(self, item: Hashable, bounds: Bounds) -> None:
+        """Xóa phần tử (bounds phải trùng với lúc thêm vào)."""
+        for cell in self._cell_range(bounds):
+            bucket = self._cells.get(cell)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(item)
+            except ValueError:
+                continue
+            if not bucket:
+                del self._cells[cell]
+        self._count -= 1
+
+    def clear(self) -> None:
+        """Xóa toàn bộ lưới."""
+        self._cells.clear()
+        self._count = 0
+
+    def query(self, point: Tuple[float, float], radius: float) -> List[Hashable]:
+        """Trả về các phần tử ứng viên có hình bao nằm trong khoảng `radius` quanh điểm.
+
+        Kết quả chỉ là ứng viên (không trùng lặp); người gọi tự kiểm tra chính xác.
+        """
+        px, py = point
+        seen: Dict[Hashable, None] = {}
+        for cell in self._cell_range((px - radius, py - radius, px + radius, py + radius)):
+            for item in self._cells.get(cell, ()):
+                seen[item] = None
+        return list(seen)
+
+
+def segment_bounds(start: Tuple[float, float], end: Tuple[float, float]) -> Bounds:
+    """Hình chữ nhật bao của một đoạn thẳng."""
+    x1, y1 = start
+    x2, y2 = end
+    return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class TextCache:
+    """Cache dùng chung cho các surface chữ đã render, khóa theo (font, nội dung, màu, antialias).
+
+    Loại bỏ mục ít dùng nhất (LRU) khi vượt quá `max_entries`. Surface được chuyển sang định dạng
+    pixel của màn hình (`convert_alpha`) nếu đã có cửa sổ, để blit nhanh hơn.
+    """
+
+    def __init__(self, max_entries: int = 512) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def render(self, font: pygame.font.Font, text: str, color: Color, antialias: bool = True) -> pygame.Surface:
+        """Trả về surface của chữ, render mới chỉ khi chưa có trong cache."""
+        key = (font, text, tuple(color), antialias)
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        self._entries[key] = surface
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Số mục, số lần trúng/trượt cache."""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_shared_cache: TextCache | None = None
+
+
+def get_text_cache() -> TextCache:
+    """Cache chữ dùng chung cho mọi thành phần giao diện."""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = TextCache()
+    return _shared_cache
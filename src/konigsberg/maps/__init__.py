@@ -0,0 +1,4 @@
+from .compiler import AnchorTemplate, CompiledMap, PartnerTable, compile_map
+from .loader import default_map, load_map
+
+__all__ = ["AnchorTemplate", "CompiledMap", "PartnerTable", "compile_map", "default_map", "load_map"]
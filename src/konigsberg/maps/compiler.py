@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Set, Tuple
+
+# Phiên bản định dạng tệp bản đồ mà trình biên dịch hiểu được
+FORMAT_VERSION = 1
+
+Point = Tuple[float, float]
+
+
+class AnchorTemplate(NamedTuple):
+    """Vị trí chuẩn hóa của một điểm neo: x = rect.x + rect.width * fx, y = rect.y + rect.height * fy."""
+
+    region: str
+    index: int
+    fx: float
+    fy: float
+
+
+class Shape(NamedTuple):
+    """Hình của một vùng đất trong tọa độ chuẩn hóa (0..1 theo rect bản đồ).
+
+    - "polygon": `points` là các đỉnh của đa giác.
+    - "ellipse": `points` = (tâm, kích thước).
+    """
+
+    kind: str
+    points: Tuple[Point, ...]
+
+
+@dataclass(frozen=True)
+class Region:
+    """Vùng đất đã biên dịch."""
+
+    id: str
+    node: str  # ID đỉnh đồ thị tương ứng
+    shapes: Tuple[Shape, ...]
+    label: str | None  # chữ vẽ trên vùng đất (None = không vẽ)
+    label_pos: Point
+    anchor_color: Tuple[int, int, int] | None
+
+
+@dataclass(frozen=True)
+class Node:
+    """Đỉnh đồ thị; `offset` là vị trí (pixel) so với tâm panel đồ thị, None = tự xếp trên vòng tròn."""
+
+    id: str
+    label: str
+    offset: Tuple[int, int] | None
+
+
+class PartnerTable:
+    """Quy tắc nối cầu đã được biên dịch: ID điểm neo -> các ID điểm neo được phép nối.
+
+    Được dựng một lần từ danh sách cặp hợp lệ của bản đồ; sau đó kiểm tra một cặp là O(1)
+    và danh sách đối tác của một điểm neo đọc trực tiếp từ bảng.
+    """
+
+    def __init__(self, anchor_ids: Iterable[str], pairs: Iterable[Tuple[str, str]]) -> None:
+        order = {anchor_id: slot for slot, anchor_id in enumerate(anchor_ids)}
+        partners: Dict[str, List[str]] = {anchor_id: [] for anchor_id in order}
+        self._valid: Set[Tuple[str, str]] = set()
+        for start_id, end_id in pairs:
+            if (start_id, end_id) in self._valid:
+                continue
+            self._valid.add((start_id, end_id))
+            self._valid.add((end_id, start_id))
+            partners[start_id].append(end_id)
+            partners[end_id].append(start_id)
+        self._partners: Dict[str, Tuple[str, ...]] = {
+            anchor_id: tuple(sorted(ids, key=order.__getitem__)) for anchor_id, ids in partners.items()
+        }
+
+    def is_valid(self, start_id: str, end_id: str) -> bool:
+        """Cặp điểm neo có được phép nối không."""
+        return (start_id, end_id) in self._valid
+
+    def partners_of(self, anchor_id: str) -> Tuple[str, ...]:
+        """Các điểm neo được phép nối với điểm neo cho trước (theo thứ tự của tập điểm neo)."""
+        return self._partners.get(anchor_id, ())
+
+    def pairs(self) -> FrozenSet[Tuple[str, str]]:
+        """Mọi cặp hợp lệ dưới dạng khóa không phụ thuộc chiều (ID nhỏ hơn đứng trước)."""
+        return frozenset((a, b) for a, b in self._valid if a <= b)
+
+
+@dataclass(frozen=True)
+class CompiledMap:
+    """Bản đồ đã biên dịch: hình học chuẩn hóa và các bảng tra cứu, sẵn sàng cho giao diện và phân tích."""
+
+    name: str
+    regions: Tuple[Region, ...]
+    nodes: Tuple[Node, ...]
+    anchors: Tuple[AnchorTemplate, ...]
+    partners: PartnerTable
+    region_to_node: Dict[str, str]
+    anchor_counts: Dict[str, int]
+
+    @property
+    def node_ids(self) -> List[str]:
+        return [node.id for node in self.nodes]
+
+    @property
+    def region_ids(self) -> Tuple[str, ...]:
+        return tuple(region.id for region in self.regions)
+
+
+# --- Biên dịch ------------------------------------------------------------------------
+def _error(message: str) -> ValueError:
+    return ValueError(f"Tệp bản đồ không hợp lệ: {message}")
+
+
+def _point(value: Any, where: str) -> Point:
+    if not (isinstance(value, list) and len(value) == 2 and all(isinstance(v, (int, float)) for v in value)):
+        raise _error(f"{where}: cần một cặp số [x, y].")
+    return float(value[0]), float(value[1])
+
+
+def _color(value: Any, where: str) -> Tuple[int, int, int] | None:
+    if value is None:
+        return None
+    if not (isinstance(value, list) and len(value) == 3 and all(isinstance(v, int) for v in value)):
+        raise _error(f"{where}: màu phải là [r, g, b].")
+    return value[0], value[1], value[2]
+
+
+def _compile_shape(spec: Any, where: str) -> Shape:
+    if isinstance(spec, dict) and "polygon" in spec:
+        points = tuple(_point(p, where) for p in spec["polygon"])
+        if len(points) < 3:
+            raise _error(f"{where}: đa giác cần ít nhất 3 đỉnh.")
+        return Shape("polygon", points)
+    if isinstance(spec, dict) and "ellipse" in spec:
+        ellipse = spec["ellipse"]
+        return Shape("ellipse", (_point(ellipse.get("center"), where), _point(ellipse.get("size"), where)))
+    raise _error(f"{where}: hình phải là 'polygon' hoặc 'ellipse'.")
+
+
+def _angles(spec: Any, where: str) -> List[float]:
+    """Danh sách góc (độ): liệt kê trực tiếp hoặc {start, step, count}."""
+    if isinstance(spec, list):
+        return [float(a) for a in spec]
+    if isinstance(spec, dict):
+        return [spec["start"] + i * spec["step"] for i in range(int(spec["count"]))]
+    raise _error(f"{where}: 'angles' phải là danh sách hoặc {{start, step, count}}.")
+
+
+def _compile_anchor_group(spec: Any, where: str) -> List[Point]:
+    """Một nhóm điểm neo: 'points' (liệt kê), 'line' (chia đều một đoạn) hoặc 'ellipse' (theo góc)."""
+    if isinstance(spec, dict) and "points" in spec:
+        return [_point(p, where) for p in spec["points"]]
+    if isinstance(spec, dict) and "line" in spec:
+        line = spec["line"]
+        (x0, y0), (x1, y1) = _point(line.get("from"), where), _point(line.get("to"), where)
+        count = int(line.get("count", 0))
+        if count < 1:
+            raise _error(f"{where}: 'count' phải >= 1.")
+        if count == 1:
+            return [(x0, y0)]
+        return [(x0 + (x1 - x0) * i / (count - 1), y0 + (y1 - y0) * i / (count - 1)) for i in range(count)]
+    if isinstance(spec, dict) and "ellipse" in spec:
+        ellipse = spec["ellipse"]
+        cx, cy = _point(ellipse.get("center"), where)
+        rx, ry = _point(ellipse.get("radii"), where)
+        points = []
+        for degrees in _angles(ellipse.get("angles"), where):
+            angle = math.radians(degrees)
+            points.append((cx + rx * math.cos(angle), cy + ry * math.sin(angle)))
+        return points
+    raise _error(f"{where}: nhóm điểm neo phải là 'points', 'line' hoặc 'ellipse'.")
+
+
+def compile_map(data: Any) -> CompiledMap:
+    """Kiểm tra và biên dịch nội dung tệp bản đồ (đã parse JSON); ném ValueError nếu sai định dạng."""
+    if not isinstance(data, dict):
+        raise _error("nội dung phải là một đối tượng JSON.")
+    if data.get("format") != FORMAT_VERSION:
+        raise _error(f"chỉ hỗ trợ 'format': {FORMAT_VERSION}.")
+
+    # Đỉnh đồ thị
+    nodes: List[Node] = []
+    for position, spec in enumerate(data.get("nodes", [])):
+        where = f"nodes[{position}]"
+        if not isinstance(spec, dict) or not isinstance(spec.get("id"), str):
+            raise _error(f"{where}: thiếu 'id'.")
+        offset = spec.get("offset")
+        if offset is not None:
+            offset = tuple(int(v) for v in _point(offset, where))
+        nodes.append(Node(spec["id"], str(spec.get("label", spec["id"])), offset))
+    node_ids = {node.id for node in nodes}
+    if len(node_ids) != len(nodes):
+        raise _error("ID đỉnh bị trùng.")
+
+    # Vùng đất: hình, nhãn, điểm neo
+    regions: List[Region] = []
+    anchors: List[AnchorTemplate] = []
+    for position, spec in enumerate(data.get("regions", [])):
+        where = f"regions[{position}]"
+        if not isinstance(spec, dict) or not isinstance(spec.get("id"), str):
+            raise _error(f"{where}: thiếu 'id'.")
+        region_id = spec["id"]
+        if spec.get("node") not in node_ids:
+            raise _error(f"{where}: 'node' phải là ID của một đỉnh đã khai báo.")
+        label = spec.get("label")
+        regions.append(Region(
+            id=region_id,
+            node=spec["node"],
+            shapes=tuple(_compile_shape(shape, f"{where}.shapes") for shape in spec.get("shapes", [])),
+            label=None if label is None else str(label.get("text")),
+            label_pos=(0.0, 0.0) if label is None else _point(label.get("at"), f"{where}.label"),
+            anchor_color=_color(spec.get("anchor_color"), where),
+        ))
+        index = 0
+        for group in spec.get("anchors", []):
+            for fx, fy in _compile_anchor_group(group, f"{where}.anchors"):
+                anchors.append(AnchorTemplate(region_id, index, fx, fy))
+                index += 1
+    if len({region.id for region in regions}) != len(regions):
+        raise _error("ID vùng đất bị trùng.")
+
+    # Các cặp điểm neo được phép nối
+    anchor_regions = {f"{t.region}_{t.index}": t.region for t in anchors}
+    pairs: List[Tuple[str, str]] = []
+    for position, pair in enumerate(data.get("bridges", [])):
+        where = f"bridges[{position}]"
+        if not (isinstance(pair, list) and len(pair) == 2 and all(item in anchor_regions for item in pair)):
+            raise _error(f"{where}: phải là cặp ID điểm neo đã khai báo.")
+        if anchor_regions[pair[0]] == anchor_regions[pair[1]]:
+            raise _error(f"{where}: hai điểm neo phải thuộc hai vùng khác nhau.")
+        pairs.append((pair[0], pair[1]))
+
+    anchor_counts: Dict[str, int] = {region.id: 0 for region in regions}
+    for template in anchors:
+        anchor_counts[template.region] += 1
+
+    return CompiledMap(
+        name=str(data.get("name", "")),
+        regions=tuple(regions),
+        nodes=tuple(nodes),
+        anchors=tuple(anchors),
+        partners=PartnerTable(anchor_regions, pairs),
+        region_to_node={region.id: region.node for region in regions},
+        anchor_counts=anchor_counts,
+    )
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+from pathlib import Path
+
+from .compiler import FORMAT_VERSION, CompiledMap, compile_map
+
+# Tăng khi cấu trúc CompiledMap thay đổi để bỏ qua các bản cache cũ
+CACHE_VERSION = 1
+
+DEFAULT_MAP_PATH = Path(__file__).with_name("konigsberg.json")
+
+
+def _cache_path(source: bytes) -> Path:
+    """Tệp cache của một bản đồ, đặt tên theo nội dung tệp nguồn và phiên bản định dạng."""
+    from ..paths import cache_dir
+
+    digest = hashlib.sha1(repr((FORMAT_VERSION, CACHE_VERSION)).encode("utf-8") + source).hexdigest()[:16]
+    return cache_dir() / f"map-{digest}.pickle"
+
+
+def load_map(path: str | Path, use_cache: bool = True) -> CompiledMap:
+    """Nạp một tệp bản đồ JSON đã biên dịch.
+
+    Bản biên dịch được lưu (pickle) trong thư mục cache, khóa theo nội dung tệp; lần nạp sau chỉ
+    cần đọc tệp nhị phân này. Cache hỏng, không đọc được hoặc thư mục cache không dùng được thì biên dịch
+    lại từ tệp nguồn.
+    """
+    source = Path(path).read_bytes()
+    cache_path = None
+    if use_cache:
+        try:
+            cache_path = _cache_path(source)
+        except OSError:
+            pass  # không tạo được thư mục cache: biên dịch mà không dùng cache
+    if cache_path is not None and cache_path.exists():
+        try:
+            with open(cache_path, "rb") as handle:
+                compiled = pickle.load(handle)
+            if isinstance(compiled, CompiledMap):
+                return compiled
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+
+    try:
+        data = json.loads(source.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Tệp bản đồ không hợp lệ: {exc}") from exc
+    compiled = compile_map(data)
+
+    if cache_path is not None:
+        from ..paths import atomic_write_bytes
+
+        try:
+            atomic_write_bytes(cache_path, pickle.dumps(compiled, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass  # thư mục cache chỉ đọc: vẫn dùng được bản vừa biên dịch
+    return compiled
+
+
+_default_map: CompiledMap | None = None
+
+
+def default_map() -> CompiledMap:
+    """Bản đồ Königsberg đi kèm gói (nạp lười, dùng chung trong tiến trình)."""
+    global _default_map
+    if _default_map is None:
+        _default_map = load_map(DEFAULT_MAP_PATH)
+    return _default_map
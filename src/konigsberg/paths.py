@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """Thư mục cache của ứng dụng (tạo nếu chưa có).
+
+    Thứ tự ưu tiên: biến môi trường `KONIGSBERG_CACHE_DIR`, `$XDG_CACHE_HOME/konigsberg`, `~/.cache/konigsberg`.
+    """
+    override = os.environ.get("KONIGSBERG_CACHE_DIR")
+    if override:
+        path = Path(override)
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = Path(base) / "konigsberg"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Ghi tệp nguyên tử: ghi ra tệp tạm cùng thư mục rồi đổi tên đè lên tệp đích."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import json
+import math
+from array import array
+from time import perf_counter
+from typing import Callable, Dict, List, Mapping, Tuple
+
+import pygame
+
+# Các pha được đo trong mỗi frame (theo thứ tự hiển thị trên overlay)
+PHASES: Tuple[str, ...] = (
+    "frame",  # update + vẽ + đẩy lên màn hình (không tính xử lý sự kiện và thời gian chờ)
+    "events",  # xử lý sự kiện
+    "update",  # Screen.update
+    "main_draw",  # MainScreen.draw
+    "sub_draw",  # SubScreen.draw
+    "map_draw",  # KonigsbergMap.draw
+    "graph_edges",  # SubScreen._draw_graph_edges
+    "analysis_text",  # MainScreen._draw_analysis_text
+    "present",  # pygame.display.flip/update
+)
+
+
+class RingBuffer:
+    """Bộ đệm vòng kích thước cố định chứa các số thực (ms); ghi đè mẫu cũ nhất khi đầy."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._data = array("d", bytes(8 * capacity))
+        self._next = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self) -> List[float]:
+        """Các mẫu theo thứ tự thời gian (cũ nhất trước)."""
+        if self.count < self.capacity:
+            return self._data[:self.count].tolist()
+        return self._data[self._next:].tolist() + self._data[:self._next].tolist()
+
+
+class _PhaseTimer:
+    """Context manager đo một pha và ghi kết quả (ms) vào bộ đệm của pha đó; dùng lại giữa các frame."""
+
+    __slots__ = ("_buffer", "_start")
+
+    def __init__(self, buffer: RingBuffer) -> None:
+        self._buffer = buffer
+        self._start = 0.0
+
+    def __enter__(self) -> "_PhaseTimer":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # noqa: ANN001
+        self._buffer.append((perf_counter() - self._start) * 1000.0)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Phân vị (nearest-rank) của một danh sách đã sắp xếp."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class FrameProfiler:
+    """Đo thời gian từng pha của mỗi frame, lưu vào bộ đệm vòng và hiển thị overlay khi bật.
+
+    Dùng: `with profiler.phase("map_draw"): ...`. Bật/tắt overlay bằng phím F3 (xử lý trong App).
+    """
+
+    def __init__(self, capacity: int = 600) -> None:
+        self.capacity = capacity
+        self.buffers: Dict[str, RingBuffer] = {name: RingBuffer(capacity) for name in PHASES}
+        self._timers: Dict[str, _PhaseTimer] = {name: _PhaseTimer(buffer) for name, buffer in self.buffers.items()}
+        self.overlay_visible = False
+        self._font: pygame.font.Font | None = None
+        # Nguồn số liệu bổ sung (ví dụ thống kê cache), hiển thị trên overlay và xuất kèm JSON
+        self.stats_sources: Dict[str, Callable[[], Mapping[str, float]]] = {}
+
+    def phase(self, name: str) -> _PhaseTimer:
+        """Bộ đo cho pha `name` (tạo mới nếu là pha chưa có trong PHASES)."""
+        timer = self._timers.get(name)
+        if timer is None:
+            self.buffers[name] = RingBuffer(self.capacity)
+            timer = self._timers[name] = _PhaseTimer(self.buffers[name])
+        return timer
+
+    def add_stats_source(self, name: str, source: Callable[[], Mapping[str, float]]) -> None:
+        """Đăng ký một hàm trả về số liệu (kích thước cache, tỉ lệ trúng...) để theo dõi."""
+        self.stats_sources[name] = source
+
+    def record(self, name: str, milliseconds: float) -> None:
+        self.phase(name)._buffer.append(milliseconds)
+
+    def stats(self, name: str) -> Dict[str, float]:
+        """p50/p95/p99/mean/max (ms) của một pha trên các mẫu đang lưu."""
+        values = sorted(self.buffers[name].values())
+        return {
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "mean": sum(values) / len(values) if values else 0.0,
+            "max": values[-1] if values else 0.0,
+            "count": len(values),
+        }
+
+    def summary(self) -> Dict[str, object]:
+        """Dữ liệu để xuất JSON: thống kê và các mẫu của từng pha."""
+        return {
+            "capacity": self.capacity,
+            "phases": {
+                name: {**self.stats(name), "samples_ms": buffer.values()}
+                for name, buffer in self.buffers.items()
+            },
+            "counters": {name: dict(source()) for name, source in self.stats_sources.items()},
+        }
+
+    def dump(self, path: str) -> None:
+        """Ghi thống kê ra tệp JSON để so sánh offline."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.summary(), handle, indent=2)
+
+    # --- Overlay ---------------------------------------------------------------
+    def toggle_overlay(self) -> None:
+        self.overlay_visible = not self.overlay_visible
+
+    def draw_overlay(self, surface: pygame.Surface, topleft: Tuple[int, int] = (20, 20)) -> pygame.Rect:
+        """Vẽ bảng p50/p95/p99 của từng pha và sparkline thời gian frame; trả về vùng đã vẽ."""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        line_height = 16
+        sparkline_height = 40
+        color = (255, 255, 255)
+        lines = ["phase          p50    p95    p99 (ms)"]
+        for name in self.buffers:
+            stats = self.stats(name)
+            lines.append(f"{name:<13}{stats['p50']:>6.2f} {stats['p95']:>6.2f} {stats['p99']:>6.2f}")
+        for name, source in self.stats_sources.items():
+            values = " ".join(
+                f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+                for key, value in source().items()
+            )
+            lines.append(f"{name}: {values}")
+        rendered = [self._font.render(text, True, color) for text in lines]
+
+        width = max(300, max(line.get_width() for line in rendered) + 16)
+        height = 6 + line_height * len(rendered) + 2 + sparkline_height + 12
+        rect = pygame.Rect(topleft, (width, height))
+
+        panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+        panel.blit(rendered[0], (8, 6))
+        for row, line in enumerate(rendered[1:]):
+            panel.blit(line, (8, 24 + row * line_height))
+
+        # Sparkline thời gian frame (mỗi mẫu một cột, chiều cao tỉ lệ với mẫu lớn nhất)
+        samples = self.buffers["frame"].values()[-(width - 16):]
+        if samples:
+            peak = max(samples) or 1.0
+            base_y = height - 6
+            for x, value in enumerate(samples):
+                bar = max(1, int(value / peak * sparkline_height))
+                pygame.draw.line(panel, (120, 220, 120), (8 + x, base_y), (8 + x, base_y - bar))
+
+        surface.blit(panel, rect)
+        return rect
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+from time import perf_counter
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Tuple
+
+import pygame
+
+MAGIC = b"KBIR"
+RECORDING_VERSION = 1
+
+# Tiêu đề: magic, phiên bản, kích thước cửa sổ, độ dài tên bản đồ (tên bản đồ UTF-8 theo sau)
+_HEADER = struct.Struct("<4sHHHH")
+# Mỗi sự kiện 16 byte: thời điểm (ms), loại, nút chuột, x, y, phím, phím bổ trợ
+_EVENT = struct.Struct("<IBBhhiH")
+
+# Mã loại sự kiện trong tệp ghi (ổn định, không phụ thuộc số hiệu sự kiện của Pygame)
+_KINDS: Dict[int, int] = {
+    pygame.MOUSEBUTTONDOWN: 1,
+    pygame.MOUSEBUTTONUP: 2,
+    pygame.MOUSEMOTION: 3,
+    pygame.KEYDOWN: 4,
+    pygame.QUIT: 5,
+}
+_EVENT_TYPES = {kind: event_type for event_type, kind in _KINDS.items()}
+
+
+class MonotonicClock:
+    """Đồng hồ mili giây tính từ lúc tạo; pygame.time.get_ticks() trả 0 khi không gọi pygame.init()."""
+
+    def __init__(self) -> None:
+        self._origin = perf_counter()
+
+    def __call__(self) -> int:
+        return int((perf_counter() - self._origin) * 1000)
+
+
+class VirtualClock:
+    """Đồng hồ do trình phát lại điều khiển: trả về thời điểm của sự kiện đang được phát."""
+
+    def __init__(self, now: int = 0) -> None:
+        self.now = now
+
+    def __call__(self) -> int:
+        return self.now
+
+
+class RecordedEvent(NamedTuple):
+    ticks: int
+    kind: int
+    button: int
+    x: int
+    y: int
+    key: int
+    mod: int
+
+    def to_event(self) -> pygame.event.Event:
+        """Dựng lại sự kiện Pygame tương ứng để đưa qua `App._dispatch`."""
+        event_type = _EVENT_TYPES[self.kind]
+        if event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            return pygame.event.Event(event_type, button=self.button, pos=(self.x, self.y))
+        if event_type == pygame.MOUSEMOTION:
+            return pygame.event.Event(event_type, pos=(self.x, self.y), rel=(0, 0), buttons=(0, 0, 0))
+        if event_type == pygame.KEYDOWN:
+            return pygame.event.Event(event_type, key=self.key, mod=self.mod, unicode="", scancode=0)
+        return pygame.event.Event(event_type)
+
+
+class RecordingHeader(NamedTuple):
+    width: int
+    height: int
+    map_name: str
+
+
+class InputRecorder:
+    """Ghi dòng sự kiện đầu vào (chuột, phím, thoát) đã được phân phát ra tệp nhị phân gọn.
+
+    Mỗi sự kiện là một bản ghi 16 byte kèm thời điểm theo đồng hồ của App, đủ để phát lại
+    đúng từng thao tác (kể cả nhận diện double click). Bộ đệm được đẩy xuống đĩa sau mỗi lô sự kiện.
+    """
+
+    def __init__(self, path: str | Path, width: int, height: int, map_name: str) -> None:
+        self.path = Path(path)
+        name = map_name.encode("utf-8")
+        self._handle: BinaryIO | None = open(self.path, "wb")
+        self._handle.write(_HEADER.pack(MAGIC, RECORDING_VERSION, width, height, len(name)))
+        self._handle.write(name)
+        self.count = 0
+
+    def record(self, event: pygame.event.Event, ticks: int) -> None:
+        kind = _KINDS.get(event.type)
+        if kind is None or self._handle is None:
+            return
+        x, y = (int(v) for v in getattr(event, "pos", (0, 0)))
+        self._handle.write(
+            _EVENT.pack(
+                ticks & 0xFFFFFFFF,
+                kind,
+                getattr(event, "button", 0),
+                x,
+                y,
+                getattr(event, "key", 0),
+                getattr(event, "mod", 0) & 0xFFFF,
+            )
+        )
+        self.count += 1
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+def read_recording(path: str | Path) -> Tuple[RecordingHeader, List[RecordedEvent]]:
+    """Đọc tệp ghi; bản ghi cuối bị cắt dở (tiến trình bị dừng giữa chừng) được bỏ qua."""
+    data = Path(path).read_bytes()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Tệp ghi thao tác không hợp lệ: {path}")
+    magic, version, width, height, name_length = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != RECORDING_VERSION:
+        raise ValueError(f"Tệp ghi thao tác không hợp lệ: {path}")
+    offset = _HEADER.size + name_length
+    header = RecordingHeader(width, height, data[_HEADER.size:offset].decode("utf-8"))
+    usable = offset + (len(data) - offset) // _EVENT.size * _EVENT.size
+    events = [RecordedEvent(*fields) for fields in _EVENT.iter_unpack(data[offset:usable])]
+    return header, events
+
+
+def _group_by_ticks(events: List[RecordedEvent]) -> Iterator[Tuple[int, List[RecordedEvent]]]:
+    """Gom các sự kiện cùng thời điểm (cùng một lô của vòng lặp sự kiện) để vẽ một frame sau mỗi lô."""
+    batch: List[RecordedEvent] = []
+    for event in events:
+        if batch and event.ticks != batch[0].ticks:
+            yield batch[0].ticks, batch
+            batch = []
+        batch.append(event)
+    if batch:
+        yield batch[0].ticks, batch
+
+
+def replay(path: str | Path, map_path: str | None = None, profile_path: str | None = None, render: bool = True) -> Dict[str, object]:
+    """Phát lại tệp ghi không cần màn hình, nhanh nhất có thể, với đồng hồ ảo.
+
+    Phân tích Euler chạy đồng bộ để kết quả tất định. Với `render=False` chỉ frame đầu tiên được vẽ.
+    Trả về thống kê và danh sách cầu cuối cùng.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from .app import App
+
+    header, events = read_recording(path)
+    clock = VirtualClock()
+    app = App(
+        width=header.width,
+        height=header.height,
+        profile_path=profile_path,
+        map_path=map_path,
+        background_analysis=False,
+        get_ticks=clock,
+    )
+    if app.map_definition.name != header.map_name:
+        raise ValueError(f"Tệp ghi dùng bản đồ '{header.map_name}', không phải '{app.map_definition.name}'")
+
+    dispatched = frames = 0
+    start = perf_counter()
+    with app:
+        # Frame đầu tiên luôn được vẽ: bố cục điểm neo (dùng cho hit-test) được tính khi vẽ
+        app._render_frame()
+        frames += 1
+        for ticks, batch in _group_by_ticks(events):
+            clock.now = ticks
+            for event in batch:
+                app._dispatch(event.to_event())
+                dispatched += 1
+                if not app.running:
+                    break
+            if render:
+                app.active_screen.update(0)
+                app._render_frame()
+                frames += 1
+            if not app.running:
+                break
+        elapsed = perf_counter() - start
+        bridges = [[start_anchor.id, end_anchor.id] for start_anchor, end_anchor in app.active_screen.sub_screen.bridges]
+    return {
+        "events": dispatched,
+        "frames": frames,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "bridges": bridges,
+    }
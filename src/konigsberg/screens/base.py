@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import List
+
 import pygame
 
 
@@ -15,4 +17,16 @@ class Screen:
     def draw(self, surface: pygame.Surface) -> None:  # noqa: D401
         """Vẽ nội dung của màn hình lên surface đích."""
 
+    def get_damage(self) -> List[pygame.Rect] | None:  # noqa: D401
+        """Các vùng đã thay đổi trong frame vừa vẽ; None nghĩa là cần cập nhật toàn màn hình."""
+        return None
+
+    def frame_rate_hint(self) -> int:  # noqa: D401
+        """FPS mong muốn ở thời điểm hiện tại; 0 nghĩa là màn hình đang rảnh (chỉ vẽ lại khi có sự kiện)."""
+        return 0
+
+    def invalidate(self) -> None:  # noqa: D401
+        """Yêu cầu vẽ lại toàn màn hình ở frame tiếp theo (ví dụ khi cửa sổ bị che rồi hiện lại)."""
 
+    def close(self) -> None:  # noqa: D401
+        """Giải phóng tài nguyên của màn hình (tệp đang mở...) trước khi ứng dụng thoát."""
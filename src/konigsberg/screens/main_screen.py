@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import pygame
-from typing import Tuple
+from typing import List, Tuple
 
+from ..graphics.damage import DamageTracker
+from ..graphics.fonts import get_font_registry
+from ..graphics.text_cache import get_text_cache
 from .base import Screen
 from .sub_screen import SubScreen
 
@@ -15,22 +18,33 @@ class MainScreen(Screen):
         self.background_color: Tuple[int, int, int] = (245, 245, 245)
         self.border_color: Tuple[int, int, int] = (0, 0, 0)
         self.text_color: Tuple[int, int, int] = (0, 0, 0)
+        
+        # Theo dõi vùng thay đổi để App chỉ đẩy các rect này lên màn hình
+        self.damage = DamageTracker()
+        self._layout_size: Tuple[int, int] | None = None
+        self._drawn_analysis: list[str] | None = None
+        
         self.sub_screen = SubScreen(self)
+        if app.session_path:
+            # Khôi phục phiên trước đó và ghi tiếp các thao tác vào nhật ký
+            self.sub_screen.open_session(app.session_path)
         
-        # Khởi tạo font hỗ trợ tiếng Việt
-        try:
-            # Thử sử dụng font hệ thống hỗ trợ Unicode
-            self.font = pygame.font.SysFont("segoeui", 20)  # Segoe UI hỗ trợ tiếng Việt tốt
-        except:
-            try:
-                self.font = pygame.font.SysFont("arial", 20)  # Arial fallback
-            except:
-                self.font = pygame.font.Font(None, 20)  # Font mặc định
+        # Font hỗ trợ tiếng Việt: Segoe UI, rồi Arial, cuối cùng là font mặc định của Pygame
+        self.font = get_font_registry().get(("segoeui", "arial"), 20)
 
     def handle_event(self, event: pygame.event.Event) -> None:
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             # Cho phép thoát nhanh bằng phím ESC
             self.app.running = False
+        elif event.type == pygame.KEYDOWN and event.mod & pygame.KMOD_CTRL and event.key in (pygame.K_z, pygame.K_y):
+            # Ctrl+Z: hoàn tác, Ctrl+Y hoặc Ctrl+Shift+Z: làm lại
+            if event.key == pygame.K_y or event.mod & pygame.KMOD_SHIFT:
+                self.sub_screen.redo()
+            else:
+                self.sub_screen.undo()
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+            # Xem đường đi Euler trước/sau trong danh sách liệt kê
+            self.sub_screen.change_walk_page(-1 if event.key == pygame.K_PAGEUP else 1)
         
         # Chuyển các sự kiện chuột vào SubScreen
         elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -43,9 +57,29 @@ class MainScreen(Screen):
             self.sub_screen.handle_mouse_motion(event.pos)
 
     def update(self, dt_ms: int) -> None:  # noqa: ARG002 - chưa cần dùng dt_ms
-        pass
+        # Nhận kết quả phân tích từ luồng nền (không chờ)
+        self.sub_screen.poll_analysis()
+
+    def get_damage(self) -> List[pygame.Rect] | None:
+        return self.damage.consume()
+
+    def invalidate(self) -> None:
+        self.damage.add_full()
+
+    def close(self) -> None:
+        self.sub_screen.close()
+
+    def frame_rate_hint(self) -> int:
+        # Chỉ cần vẽ liên tục khi đang kéo cầu hoặc đang chờ kết quả phân tích nền; còn lại chờ sự kiện
+        return 60 if self.sub_screen.dragging or self.sub_screen.analysis_pending else 0
 
     def draw(self, surface: pygame.Surface) -> None:
+        # Bố cục thay đổi (hoặc frame đầu tiên) -> cập nhật toàn màn hình
+        layout_size = (self.app.width, self.app.height)
+        if layout_size != self._layout_size:
+            self._layout_size = layout_size
+            self.damage.add_full()
+        
         surface.fill(self.background_color)
 
         # Vẽ khung ngoài (màn hình chính)
@@ -67,7 +101,8 @@ class MainScreen(Screen):
         sub_rect = pygame.Rect(sub_left, sub_top, sub_width, sub_height)
 
         # Vẽ SubScreen
-        self.sub_screen.draw(surface, sub_rect)
+        with self.app.profiler.phase("sub_draw"):
+            self.sub_screen.draw(surface, sub_rect)
         
         # Tính toán vùng văn bản phân tích (phần còn trống bên phải)
         analysis_left = sub_rect.right + inner_gap
@@ -76,14 +111,21 @@ class MainScreen(Screen):
         analysis_height = sub_rect.height
         analysis_rect = pygame.Rect(analysis_left, analysis_top, analysis_width, analysis_height)
         
-        # Vẽ văn bản phân tích trong vùng còn trống
-        self._draw_analysis_text(surface, analysis_rect)
+        # Vẽ văn bản phân tích trong vùng còn trống (ngắt dòng theo độ rộng thực của vùng)
+        self.sub_screen.set_analysis_layout(self.font, analysis_rect.width - 40)
+        with self.app.profiler.phase("analysis_text"):
+            self._draw_analysis_text(surface, analysis_rect)
     
     def _draw_analysis_text(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
         """Vẽ văn bản phân tích trong vùng được chỉ định."""
         # Lấy kết quả phân tích từ SubScreen
         analysis_result = self.sub_screen.get_analysis_result()
         
+        # Chỉ báo vùng phân tích thay đổi khi nội dung khác frame trước
+        if analysis_result != self._drawn_analysis:
+            self._drawn_analysis = list(analysis_result)
+            self.damage.add(rect)
+        
         if not analysis_result:
             return
             
@@ -93,7 +135,8 @@ class MainScreen(Screen):
         
         # Vẽ tiêu đề
         title = "KẾT QUẢ PHÂN TÍCH"
-        title_surface = self.font.render(title, True, self.text_color)
+        text_cache = get_text_cache()
+        title_surface = text_cache.render(self.font, title, self.text_color)
         title_rect = title_surface.get_rect(centerx=rect.centerx, y=rect.y + 20)
         surface.blit(title_surface, title_rect)
         
@@ -111,7 +154,7 @@ class MainScreen(Screen):
             if start_y + i * line_height > rect.bottom - 20:  # Kiểm tra không vượt quá khung
                 break
                 
-            text_surface = self.font.render(line, True, self.text_color)
+            text_surface = text_cache.render(self.font, line, self.text_color)
             text_rect = text_surface.get_rect(x=rect.x + 20, y=start_y + i * line_height)
             surface.blit(text_surface, text_rect)
 
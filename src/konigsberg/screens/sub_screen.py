@@ -3,11 +3,21 @@ from __future__ import annotations
 from typing import Tuple
 
 import pygame
-import networkx as nx
 
+from ..analysis import engine as euler
+from ..analysis.bridge_store import BridgeStore
+from ..analysis.engine import EulerEngine
+from ..analysis.memo import AnalysisMemo
+from ..analysis.optimizer import legal_pair_counts, minimal_fix
+from ..analysis.walks import EulerWalks
+from ..analysis.worker import AnalysisWorker, compute_walks
 from ..graphics.konigsberg_map import KonigsbergMap
 from ..graphics.graph_nodes import GraphNodeManager
 from ..graphics.bridge_anchor import BridgeAnchor
+from ..graphics.edge_geometry import edge_polylines
+from ..graphics.spatial_index import UniformGrid, segment_bounds
+from ..maps import PartnerTable
+from ..session import ADD, REMOVE, BridgeCommand, CommandHistory, SessionJournal
 
 
 class SubScreen:
@@ -21,24 +31,48 @@ class SubScreen:
         self.bridge_color: Tuple[int, int, int] = (139, 69, 19) # SaddleBrown
         self.text_color: Tuple[int, int, int] = (0, 0, 0)
         
+        # Bản đồ đã biên dịch (vùng đất, điểm neo, cặp được phép nối, ánh xạ vùng -> đỉnh)
+        self.map_definition = main_screen.app.map_definition
+        # Số cầu tối đa giữa mỗi cặp đỉnh theo bảng cặp điểm neo (dùng cho gợi ý sửa đồ thị)
+        self.legal_pair_counts = legal_pair_counts(self.map_definition)
+        
         # Components
-        self.konigsberg_map = KonigsbergMap()
-        self.graph_nodes = GraphNodeManager()
+        self.konigsberg_map = KonigsbergMap(self.map_definition)
+        self.graph_nodes = GraphNodeManager(self.map_definition)
         
         # Graph logic
-        self.graph = nx.MultiGraph()  # Sử dụng MultiGraph để cho phép nhiều cạnh giữa 2 đỉnh
-        self.bridges: list[tuple[BridgeAnchor, BridgeAnchor]] = []
+        # Kho cầu duy nhất: ID cầu ổn định + ma trận số cạnh giữa các đỉnh (đa đồ thị)
+        self.bridges = BridgeStore(self.map_definition.node_ids)
         self.dragging = False
         self.start_anchor: BridgeAnchor | None = None
         self.mouse_pos = (0, 0)
         
-        self.REGION_TO_NODE_ID = {
-            "north": "1",
-            "kneiphof": "2",
-            "lomse": "3",
-            "south": "4",
-        }
+        self.REGION_TO_NODE_ID = dict(self.map_definition.region_to_node)
+        
+        # Bộ máy phân tích Euler tăng dần; văn bản kết quả chỉ dựng lại khi cần hiển thị
+        self.euler_engine = EulerEngine(self.map_definition.node_ids)
         self.analysis_result: list[str] = []
+        self.analysis_walk: list[str] | None = None
+        self._analysis_stale = True
+        # Kết quả đã hoàn chỉnh theo vector số cạnh: trạng thái lặp lại chỉ tốn một lần tra dict
+        self.analysis_memo = AnalysisMemo()
+        main_screen.app.profiler.add_stats_source("analysis_memo", self.analysis_memo.stats)
+        # Đường đi Euler được tính ở luồng nền (nếu bật); kết quả của trạng thái cũ bị bỏ theo thế hệ
+        self.analysis_worker = AnalysisWorker() if main_screen.app.background_analysis else None
+        # Kết quả (đường đi đầu tiên, bộ đếm mọi đường đi Euler phân biệt) của trạng thái hiện tại; xem từng
+        # trang đường đi bằng PageUp/PageDown
+        self._walk_result: tuple[list[str], EulerWalks | None] | None = None
+        self._walk_failed = False
+        self.walk_page = 0
+        self.walks_per_page = 1
+        
+        # Font và độ rộng (pixel) dùng để ngắt dòng đường đi trong vùng phân tích
+        self._wrap_font: pygame.font.Font | None = None
+        self._wrap_width = 0
+        
+        # Lịch sử undo/redo; nhật ký phiên trên đĩa (nếu chạy với --session)
+        self.history = CommandHistory()
+        self.journal: SessionJournal | None = None
         
         # Double click detection
         self.last_click_time = 0
@@ -46,10 +80,25 @@ class SubScreen:
         self.double_click_threshold = 500  # milliseconds
         self.double_click_distance = 10  # pixels
         
-        # Highlight system
-        self.highlighted_anchors: list[BridgeAnchor] = []
+        # Highlight system: tập ID các điểm neo có thể nối với điểm đang kéo
+        self.highlighted_ids: set[str] = set()
+        
+        # Lớp cầu vẽ sẵn: chỉ vẽ lại khi danh sách cầu hoặc vùng bản đồ thay đổi
+        self._bridge_layer: pygame.Surface | None = None
+        self._bridge_layer_rect: pygame.Rect | None = None
         
-        self._analyze_graph() # Initial analysis
+        # Lưới không gian của các đoạn cầu (cho double click xóa cầu), cập nhật khi thêm/xóa cầu
+        self.bridge_pick_distance = 15  # Chỉ xóa nếu click đủ gần (15 pixels)
+        self._bridge_grid = UniformGrid()
+        self._bridge_grid_layout = -1  # layout_version của điểm neo khi dựng lưới
+        
+        # Cache hình học cạnh đồ thị: (u, v, số cạnh) -> các đường vẽ; xóa khi bố cục node thay đổi
+        self._edge_geometry: dict[tuple[str, str, int], list[list[tuple[float, float]]]] = {}
+        self._edge_geometry_layout = -1
+        
+        # Trạng thái đã vẽ ở frame trước, dùng để báo vùng thay đổi (damage)
+        self._drawn_highlights: frozenset[str] = frozenset()
+        self._drawn_drag_rect: pygame.Rect | None = None
 
     def draw(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
         # Vẽ nền và khung
@@ -93,27 +142,71 @@ class SubScreen:
             2
         )
         
+        profiler = self.main_screen.app.profiler
+        
         # Vẽ bản đồ Königsberg với highlighted anchors
-        self.konigsberg_map.draw(surface, map_rect, self.highlighted_anchors)
+        with profiler.phase("map_draw"):
+            self.konigsberg_map.draw(surface, map_rect, self.highlighted_ids)
         
-        # Vẽ các cây cầu đã tạo
-        for start, end in self.bridges:
-            pygame.draw.line(surface, self.bridge_color, (start.x, start.y), (end.x, end.y), 5)
+        self._report_highlight_damage()
+        
+        # Vẽ các cây cầu đã tạo (blit lớp cầu vẽ sẵn)
+        if self._bridge_layer is None or self._bridge_layer_rect != map_rect:
+            self._bridge_layer = self._render_bridge_layer(map_rect)
+            self._bridge_layer_rect = pygame.Rect(map_rect)
+            # Danh sách cầu đổi: cả bản đồ lẫn panel đồ thị cần cập nhật
+            self.main_screen.damage.add(map_rect)
+            self.main_screen.damage.add(graph_rect)
+        surface.blit(self._bridge_layer, map_rect)
         
         # Vẽ đường nối khi đang kéo chuột
+        drag_rect = None
         if self.dragging and self.start_anchor:
-            pygame.draw.line(surface, self.bridge_color, (self.start_anchor.x, self.start_anchor.y), self.mouse_pos, 4)
+            drag_rect = pygame.draw.line(surface, self.bridge_color, (self.start_anchor.x, self.start_anchor.y), self.mouse_pos, 4)
+        self._report_drag_damage(drag_rect)
         
         # Vẽ 4 node đồ thị
         self.graph_nodes.generate_nodes(graph_rect)
         self.graph_nodes.draw_nodes(surface)
     
         # Vẽ các cạnh của đồ thị
-        self._draw_graph_edges(surface)
+        with profiler.phase("graph_edges"):
+            self._draw_graph_edges(surface)
+
+    def _report_highlight_damage(self) -> None:
+        """Báo vùng của các điểm neo vừa được bật/tắt highlight."""
+        if self.highlighted_ids == self._drawn_highlights:
+            return
+        anchor_manager = self.konigsberg_map.anchor_manager
+        for anchor_id in self.highlighted_ids.symmetric_difference(self._drawn_highlights):
+            # Bán kính lớn nhất khi highlight (8) cộng viền
+            self.main_screen.damage.add(anchor_manager.get_anchor_by_id(anchor_id).get_rect(radius=11))
+        self._drawn_highlights = frozenset(self.highlighted_ids)
+
+    def _report_drag_damage(self, drag_rect: pygame.Rect | None) -> None:
+        """Báo vùng của đường kéo ở frame trước và frame này."""
+        if drag_rect == self._drawn_drag_rect:
+            return
+        for rect in (self._drawn_drag_rect, drag_rect):
+            if rect is not None:
+                self.main_screen.damage.add(rect.inflate(4, 4))
+        self._drawn_drag_rect = drag_rect
+
+    def _render_bridge_layer(self, map_rect: pygame.Rect) -> pygame.Surface:
+        """Vẽ tất cả các cây cầu vào một surface trong suốt có kích thước vùng bản đồ."""
+        layer = pygame.Surface(map_rect.size, pygame.SRCALPHA)
+        ox, oy = map_rect.x, map_rect.y
+        for start, end in self.bridges:
+            pygame.draw.line(layer, self.bridge_color, (start.x - ox, start.y - oy), (end.x - ox, end.y - oy), 5)
+        return layer
+
+    def _invalidate_bridge_layer(self) -> None:
+        """Đánh dấu lớp cầu cần vẽ lại (gọi mỗi khi danh sách cầu thay đổi)."""
+        self._bridge_layer = None
 
     def handle_mouse_down(self, point: Tuple[float, float]) -> None:
         """Xử lý khi nhấn chuột trái."""
-        current_time = pygame.time.get_ticks()
+        current_time = self.main_screen.app.get_ticks()  # đồng hồ ảo khi phát lại thao tác
         
         # Kiểm tra double click
         time_diff = current_time - self.last_click_time
@@ -144,36 +237,164 @@ class SubScreen:
             if end_anchor and self.start_anchor.region != end_anchor.region:
                 # Kiểm tra xem có được phép kết nối không
                 if self._is_valid_connection(self.start_anchor, end_anchor):
-                    start_node = self.REGION_TO_NODE_ID[self.start_anchor.region]
-                    end_node = self.REGION_TO_NODE_ID[end_anchor.region]
-
-                    self.graph.add_edge(start_node, end_node)
-                    self.bridges.append((self.start_anchor, end_anchor))
-                    self._analyze_graph()
+                    self._execute(BridgeCommand(ADD, self.start_anchor.id, end_anchor.id))
 
         self.dragging = False
         self.start_anchor = None
         # Clear highlights
-        self.highlighted_anchors.clear()
+        self.highlighted_ids.clear()
 
     def handle_mouse_motion(self, point: Tuple[float, float]) -> None:
         """Xử lý khi di chuyển chuột."""
         if self.dragging:
             self.mouse_pos = point
 
-    def _analyze_graph(self):
-        """Phân tích đồ thị và cập nhật kết quả."""
-        if not self.graph.nodes:
-            self.graph.add_nodes_from(["1", "2", "3", "4"])
-            
-        degrees = dict(self.graph.degree())
-        odd_degree_nodes = [node for node, degree in degrees.items() if degree % 2 != 0]
-        total_edges = self.graph.number_of_edges()
-        
-        # Tìm các đỉnh có cạnh (bậc > 0)
-        nodes_with_edges = [node for node, degree in degrees.items() if degree > 0]
+    def _add_bridge(self, start_anchor: BridgeAnchor, end_anchor: BridgeAnchor) -> int | None:
+        """Thêm cầu vào kho, đồ thị phân tích và lưới không gian; trả về None nếu cặp điểm neo đã có cầu."""
+        start_node = self.REGION_TO_NODE_ID[start_anchor.region]
+        end_node = self.REGION_TO_NODE_ID[end_anchor.region]
+        
+        self._sync_bridge_grid()
+        bridge_id = self.bridges.add(start_anchor, end_anchor, start_node, end_node)
+        if bridge_id is None:
+            return None
+        self.euler_engine.add_edge(start_node, end_node)
+        self._bridge_grid.insert(bridge_id, self._bridge_bounds(bridge_id))
+        self._invalidate_bridge_layer()
+        self._invalidate_analysis()
+        return bridge_id
+
+    def _remove_bridge(self, bridge_id: int) -> None:
+        """Xóa đúng cầu có ID cho trước khỏi kho, đồ thị phân tích và lưới không gian."""
+        self._sync_bridge_grid()
+        bounds = self._bridge_bounds(bridge_id)
+        start_node, end_node = self.bridges.nodes_of(bridge_id)
+        
+        self.bridges.remove(bridge_id)
+        self.euler_engine.remove_edge(start_node, end_node)
+        self._bridge_grid.remove(bridge_id, bounds)
+        self._invalidate_bridge_layer()
+        self._invalidate_analysis()
+
+    # --- Lệnh, undo/redo và nhật ký phiên --------------------------------------------
+    def _apply(self, command: BridgeCommand) -> bool:
+        """Thực hiện một lệnh trên danh sách cầu; trả về False nếu lệnh không còn áp dụng được."""
+        if command.op == ADD:
+            anchor_manager = self.konigsberg_map.anchor_manager
+            start_anchor = anchor_manager.get_anchor_by_id(command.start_id)
+            end_anchor = anchor_manager.get_anchor_by_id(command.end_id)
+            if start_anchor is None or end_anchor is None or not self._is_valid_connection(start_anchor, end_anchor):
+                return False
+            return self._add_bridge(start_anchor, end_anchor) is not None
+        bridge_id = self.bridges.find(command.start_id, command.end_id)
+        if bridge_id is None:
+            return False
+        self._remove_bridge(bridge_id)
+        return True
+
+    def _execute(self, command: BridgeCommand) -> None:
+        """Thực hiện lệnh của người dùng: đưa vào lịch sử undo và ghi nhật ký phiên."""
+        if self._apply(command):
+            self.history.push(command)
+            if self.journal is not None:
+                self.journal.record(command)
+
+    def undo(self) -> None:
+        """Hoàn tác thao tác cầu gần nhất (Ctrl+Z)."""
+        command = self.history.undo()
+        if command is not None and self._apply(command.inverse()) and self.journal is not None:
+            self.journal.record(command.inverse())
+
+    def redo(self) -> None:
+        """Làm lại thao tác vừa hoàn tác (Ctrl+Y)."""
+        command = self.history.redo()
+        if command is not None and self._apply(command) and self.journal is not None:
+            self.journal.record(command)
+
+    def open_session(self, path: str) -> None:
+        """Khôi phục danh sách cầu từ nhật ký phiên và ghi tiếp các thao tác sau đó vào đó."""
+        self.close_session()
+        journal = SessionJournal(path, self.map_definition)
+        pairs = journal.open()
+        for bridge_id in self.bridges.ids():
+            self._remove_bridge(bridge_id)
+        self.history.clear()
+        for start_id, end_id in pairs:
+            self._apply(BridgeCommand(ADD, start_id, end_id))
+        self.journal = journal
+
+    def close_session(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def close(self) -> None:
+        """Đóng nhật ký phiên và dừng luồng phân tích nền."""
+        self.close_session()
+        if self.analysis_worker is not None:
+            self.analysis_worker.shutdown()
+
+    def set_analysis_layout(self, font: pygame.font.Font, max_width: int) -> None:
+        """Đặt font và độ rộng tối đa (pixel) của một dòng kết quả; đổi thì dựng lại văn bản."""
+        if font is not self._wrap_font or max_width != self._wrap_width:
+            self._wrap_font = font
+            self._wrap_width = max_width
+            self._invalidate_analysis()
+
+    def _fits(self, text: str) -> bool:
+        """Dòng có vừa độ rộng vùng phân tích không (đo bằng font.size; chưa có font thì giới hạn 30 ký tự)."""
+        if self._wrap_font is None:
+            return len(text) <= 30
+        return self._wrap_font.size(text)[0] <= self._wrap_width
+
+    def _invalidate_analysis(self) -> None:
+        """Đánh dấu kết quả phân tích đã cũ; văn bản sẽ được dựng lại ở lần hiển thị tiếp theo."""
+        self._analysis_stale = True
+        self._walk_result = None
+        self._walk_failed = False
+        self.walk_page = 0
+        if self.analysis_worker is not None:
+            self.analysis_worker.invalidate()
+
+    @property
+    def analysis_pending(self) -> bool:
+        """Đường đi Euler (và số đường đi) của trạng thái hiện tại đang được tính ở luồng nền."""
+        return self.analysis_worker is not None and self.analysis_worker.pending
+
+    def poll_analysis(self) -> None:
+        """Nhận đường đi Euler từ luồng nền (gọi mỗi frame, không chặn); kết quả của trạng thái cũ bị bỏ."""
+        if self.analysis_worker is None:
+            return
+        result = self.analysis_worker.poll()
+        if result is None:
+            return
+        self._walk_result = None if result.walk is None else (result.walk, result.walks)
+        self._walk_failed = result.walk is None
+        self._analysis_stale = True
+
+    def _current_walks(self) -> tuple[list[str], EulerWalks | None] | None:
+        """Đường đi Euler đầu tiên và bộ đếm đường đi của đồ thị hiện tại; None nếu đang tính ở luồng nền.
+
+        Không có luồng nền (phát lại, phân tích đồng bộ) thì tính ngay; bộ đếm đã bị giới hạn kích thước.
+        """
+        if self._walk_failed:
+            raise RuntimeError("Không tính được đường đi Euler")
+        if self._walk_result is None:
+            engine = self.euler_engine
+            if self.analysis_worker is None:
+                self._walk_result = compute_walks(engine.nodes, engine.pair_counts())
+            elif not self.analysis_worker.pending:
+                self.analysis_worker.submit(engine.nodes, engine.pair_counts())
+        return self._walk_result
+
+    def _analyze_graph(self) -> None:
+        """Dựng văn bản kết quả phân tích từ trạng thái của bộ máy Euler."""
+        engine = self.euler_engine
+        degrees = engine.degrees()
+        verdict = engine.verdict()
         
         self.analysis_result = []
+        self.analysis_walk = None
         
         # 1. Tính bậc của các đỉnh
         self.analysis_result.append("Bậc của các đỉnh:")
@@ -182,182 +403,187 @@ class SubScreen:
         self.analysis_result.append("") # Dòng trống
 
         # 2. Kiểm tra có cầu nào không
-        if total_edges == 0:
+        if verdict == euler.EMPTY:
             self.analysis_result.append("Kết luận: Chưa có cầu nào được xây dựng.")
             self.analysis_result.append("Hãy kéo thả giữa các vùng đất để tạo cầu!")
             return
 
-        # 3. Kiểm tra tính liên thông của đồ thị con chứa các đỉnh có cạnh
-        if len(nodes_with_edges) > 1:
-            subgraph = self.graph.subgraph(nodes_with_edges)
-            is_connected = nx.is_connected(subgraph)
-        else:
-            is_connected = True  # Nếu chỉ có 1 đỉnh có cạnh thì coi như liên thông
-
-        # 4. Kiểm tra có đỉnh cô lập không
-        isolated_nodes = [node for node, degree in degrees.items() if degree == 0]
-        has_isolated_nodes = len(isolated_nodes) > 0
-
-        # 5. Áp dụng định lý Euler
-        if not is_connected or has_isolated_nodes:
+        # 3. Áp dụng định lý Euler (liên thông, đỉnh cô lập, số đỉnh bậc lẻ)
+        odd_degree_nodes = engine.odd_nodes()
+        if verdict == euler.DISCONNECTED:
+            isolated_nodes = engine.isolated_nodes()
             self.analysis_result.append("Kết luận: Không tồn tại Đường đi")
             self.analysis_result.append("hay Chu trình Euler.")
-            if not is_connected:
+            if not engine.is_connected():
                 self.analysis_result.append("Lý do: Đồ thị không liên thông.")
-            if has_isolated_nodes:
+            if isolated_nodes:
                 self.analysis_result.append(f"Các đỉnh bị cô lập: {', '.join(sorted(isolated_nodes))}.")
-        elif len(odd_degree_nodes) == 0:
+            self._append_fix_lines()
+        elif verdict == euler.CIRCUIT:
             self.analysis_result.append("Kết luận: Tồn tại Chu trình Euler.")
-            # Tìm chu trình Euler
-            try:
-                euler_circuit = list(nx.eulerian_circuit(self.graph))
-                self.analysis_result.append("Chu trình Euler:")
-                path_str = " → ".join([str(edge[0]) for edge in euler_circuit] + [str(euler_circuit[0][0])])
-                # Chia đường đi thành nhiều dòng nếu quá dài
-                if len(path_str) > 30:
-                    words = path_str.split(" → ")
-                    line = ""
-                    for i, word in enumerate(words):
-                        if len(line + word) > 30 and line:
-                            self.analysis_result.append(f"  {line}")
-                            line = word
-                        else:
-                            line += (" → " if line else "") + word
-                    if line:
-                        self.analysis_result.append(f"  {line}")
-                else:
-                    self.analysis_result.append(f"  {path_str}")
-            except:
-                self.analysis_result.append("(Có thể đi qua tất cả các cầu mỗi cầu một lần)")
-                self.analysis_result.append("và quay về điểm xuất phát.")
-        elif len(odd_degree_nodes) == 2:
+            self._append_walks(
+                "chu trình Euler",
+                ["(Có thể đi qua tất cả các cầu mỗi cầu một lần)", "và quay về điểm xuất phát."],
+            )
+        elif verdict == euler.PATH:
             self.analysis_result.append("Kết luận: Chỉ tồn tại Đường đi Euler.")
-            # Tìm đường đi Euler
-            try:
-                euler_path = list(nx.eulerian_path(self.graph))
-                self.analysis_result.append("Đường đi Euler:")
-                path_str = " → ".join([str(edge[0]) for edge in euler_path] + [str(euler_path[-1][1])])
-                # Chia đường đi thành nhiều dòng nếu quá dài
-                if len(path_str) > 30:
-                    words = path_str.split(" → ")
-                    line = ""
-                    for i, word in enumerate(words):
-                        if len(line + word) > 30 and line:
-                            self.analysis_result.append(f"  {line}")
-                            line = word
-                        else:
-                            line += (" → " if line else "") + word
-                    if line:
-                        self.analysis_result.append(f"  {line}")
-                else:
-                    self.analysis_result.append(f"  {path_str}")
-            except:
-                self.analysis_result.append("Phải bắt đầu ở một đỉnh bậc lẻ và")
-                self.analysis_result.append(f"kết thúc ở đỉnh còn lại: {odd_degree_nodes[0]}, {odd_degree_nodes[1]}.")
+            self._append_walks(
+                "đường đi Euler",
+                ["Phải bắt đầu ở một đỉnh bậc lẻ và", f"kết thúc ở đỉnh còn lại: {odd_degree_nodes[0]}, {odd_degree_nodes[1]}."],
+            )
         else:
             self.analysis_result.append("Kết luận: Không tồn tại Đường đi")
             self.analysis_result.append("hay Chu trình Euler.")
             self.analysis_result.append(f"Số đỉnh bậc lẻ là {len(odd_degree_nodes)}: {', '.join(sorted(odd_degree_nodes))}.")
+            self._append_fix_lines()
+
+    def _append_walks(self, noun: str, fallback: list[str]) -> None:
+        """Thêm số đường đi Euler phân biệt và các đường đi của trang hiện tại.
+
+        Đồ thị quá lớn để đếm thì chỉ hiện một đường đi; tính thất bại thì hiện `fallback`.
+        """
+        title = noun[:1].upper() + noun[1:]
+        try:
+            result = self._current_walks()
+        except Exception:
+            self.analysis_result.extend(fallback)
+            return
+        if result is None:
+            self.analysis_result.append(f"{title}:")
+            self.analysis_result.append("  Đang tính toán…")
+            return
+        walk, walks = result
+        if walks is None:
+            self.analysis_walk = walk
+            self._append_walk_lines(f"{title}:", walk)
+            return
+        total = walks.total
+        if len(walks.starts) == 1:
+            self.analysis_result.append(f"Số {noun} từ đỉnh {walks.nodes[walks.starts[0]]}: {total}")
+        else:
+            self.analysis_result.append(f"Số {noun}: {total}")
+        if walks.bridge_total != total:
+            self.analysis_result.append(f"({walks.bridge_total} nếu phân biệt cầu song song)")
+        for rank, page_walk in walks.page(self.walk_page, self.walks_per_page):
+            if self.analysis_walk is None:
+                self.analysis_walk = page_walk
+            self._append_walk_lines(f"{title} #{rank + 1}:", page_walk)
+        if total > self.walks_per_page:
+            self.analysis_result.append("(PageUp/PageDown: xem đường khác)")
+
+    def change_walk_page(self, step: int) -> None:
+        """Chuyển sang trang đường đi Euler trước/sau (PageUp/PageDown); chỉ khi đã đếm xong."""
+        walks = self._walk_result[1] if self._walk_result is not None else None
+        if walks is None:
+            return
+        pages = -(-walks.total // self.walks_per_page)
+        page = min(max(self.walk_page + step, 0), pages - 1)
+        if page != self.walk_page:
+            self.walk_page = page
+            self._analysis_stale = True
+
+    def _append_fix_lines(self) -> None:
+        """Thêm gợi ý thêm/bỏ ít cầu nhất để đồ thị có đường đi hoặc chu trình Euler."""
+        engine = self.euler_engine
+        fix = minimal_fix(engine.nodes, engine.pair_counts(), self.legal_pair_counts)
+        self.analysis_result.append("")
+        if fix is None:
+            self.analysis_result.append("Không tìm được cách sửa bằng các cầu hợp lệ.")
+            return
+        title = f"Gợi ý sửa ít nhất ({fix.cost} thay đổi):" if fix.optimal else f"Gợi ý sửa ({fix.cost} thay đổi, gần đúng):"
+        self.analysis_result.append(title)
+        for change in fix.changes:
+            if change.delta > 0:
+                self.analysis_result.append(f"  + Thêm {change.delta} cầu giữa {change.u} – {change.v}")
+            else:
+                self.analysis_result.append(f"  − Bỏ {-change.delta} cầu giữa {change.u} – {change.v}")
+        target = "Chu trình Euler" if fix.verdict == euler.CIRCUIT else "Đường đi Euler"
+        self.analysis_result.append(f"Sau khi sửa: tồn tại {target}.")
+
+    def _append_walk_lines(self, title: str, walk: list[str]) -> None:
+        """Thêm tiêu đề và dãy đỉnh của đường đi vào kết quả, chia thành nhiều dòng nếu quá rộng."""
+        self.analysis_result.append(title)
+        line = ""
+        for word in walk:
+            candidate = line + (" → " if line else "") + word
+            if line and not self._fits(f"  {candidate}"):
+                self.analysis_result.append(f"  {line}")
+                line = word
+            else:
+                line = candidate
+        if line:
+            self.analysis_result.append(f"  {line}")
             
     def _draw_graph_edges(self, surface: pygame.Surface) -> None:
         """Vẽ các cạnh (đường nối) giữa các node của đồ thị, nối từ rìa node, xử lý multi-edge bằng đường cong."""
-        drawn_pairs = set()
-        spacing = 8.0  # Khoảng cách giữa các đường cong
+        # Hình học của cạnh chỉ phụ thuộc vào cặp node, số cạnh và bố cục node -> tính một lần rồi dùng lại
+        if self._edge_geometry_layout != self.graph_nodes.layout_version:
+            self._edge_geometry.clear()
+            self._edge_geometry_layout = self.graph_nodes.layout_version
 
-        for u, v in self.graph.edges():
-            # Sắp xếp để xử lý mỗi cặp đỉnh một lần duy nhất
-            u_node, v_node = tuple(sorted((u, v)))
+        # Mỗi cặp đỉnh được xử lý một lần duy nhất cùng với số cạnh song song
+        for u_node, v_node, edge_count in self.bridges.pairs():
+            key = (u_node, v_node, edge_count)
+            polylines = self._edge_geometry.get(key)
+            if polylines is None:
+                polylines = self._compute_edge_polylines(u_node, v_node, edge_count)
+                self._edge_geometry[key] = polylines
             
-            if (u_node, v_node) in drawn_pairs:
-                continue
-            drawn_pairs.add((u_node, v_node))
+            for points in polylines:
+                if len(points) == 2:
+                    # Vẽ đường thẳng từ rìa đến rìa
+                    pygame.draw.line(surface, self.border_color, points[0], points[1], 4)
+                else:
+                    pygame.draw.lines(surface, self.border_color, False, points, 4)
 
-            node_u = self.graph_nodes.get_node_by_id(u_node)
-            node_v = self.graph_nodes.get_node_by_id(v_node)
+    def _compute_edge_polylines(self, u_node: str, v_node: str, edge_count: int) -> list[list[tuple[float, float]]]:
+        """Tính đường vẽ của các cạnh song song giữa hai node theo bố cục hiện tại."""
+        node_u = self.graph_nodes.get_node_by_id(u_node)
+        node_v = self.graph_nodes.get_node_by_id(v_node)
+        if not node_u or not node_v:
+            return []
+        return edge_polylines(
+            (node_u.x, node_u.y), node_u.radius,
+            (node_v.x, node_v.y), node_v.radius,
+            edge_count,
+            spacing=8.0,  # Khoảng cách giữa các đường cong
+        )
 
-            if not node_u or not node_v:
-                continue
-            
-            edge_count = self.graph.number_of_edges(u_node, v_node)
-            
-            center_u = pygame.Vector2(node_u.x, node_u.y)
-            center_v = pygame.Vector2(node_v.x, node_v.y)
-            
-            # Tính vector hướng từ u đến v
-            direction = center_v - center_u
-            if direction.length() == 0:
-                continue
-            direction_normalized = direction.normalize()
-            
-            if edge_count == 1:
-                # Tính điểm bắt đầu và kết thúc trên rìa của node
-                start_pos = center_u + direction_normalized * node_u.radius
-                end_pos = center_v - direction_normalized * node_v.radius
-                
-                # Vẽ đường thẳng từ rìa đến rìa
-                pygame.draw.line(surface, self.border_color, start_pos, end_pos, 4)
-            else:
-                # Nếu có nhiều cạnh, vẽ các đường cong
-                # Vector vuông góc để tạo độ cong
-                normal = direction_normalized.rotate(90)
-                
-                for i in range(edge_count):
-                    # Tính toán độ lệch cho mỗi đường cong
-                    offset = (i - (edge_count - 1) / 2.0) * spacing
-                    
-                    # Điểm control cho đường cong Bezier (điểm giữa được dịch chuyển)
-                    mid_point = center_u.lerp(center_v, 0.5) + normal * offset * 2.5
-                    
-                    # Tính điểm bắt đầu và kết thúc trên rìa cho đường cong
-                    # Hướng từ tâm node đến điểm control để tính điểm trên rìa
-                    start_dir = (mid_point - center_u).normalize()
-                    end_dir = (mid_point - center_v).normalize()
-                    
-                    start_pos = center_u + start_dir * node_u.radius
-                    end_pos = center_v + end_dir * node_v.radius
-                    
-                    # Vẽ đường cong Bezier bằng nhiều đoạn thẳng nhỏ
-                    points = []
-                    steps = 20  # Càng nhiều steps, đường cong càng mượt
-                    for step in range(steps + 1):
-                        t = step / steps
-                        # Thuật toán De Casteljau's cho Bezier bậc 2
-                        p = start_pos.lerp(mid_point, t).lerp(mid_point.lerp(end_pos, t), t)
-                        points.append((p.x, p.y))
-                    
-                    pygame.draw.lines(surface, self.border_color, False, points, 4)
+    def _bridge_bounds(self, bridge_id: int) -> tuple[float, float, float, float]:
+        """Hình chữ nhật bao của đoạn cầu."""
+        start, end = self.bridges.get(bridge_id)
+        return segment_bounds((start.x, start.y), (end.x, end.y))
+
+    def _sync_bridge_grid(self) -> None:
+        """Dựng lại lưới cầu nếu bố cục điểm neo đã thay đổi kể từ lần dựng trước."""
+        layout_version = self.konigsberg_map.anchor_manager.layout_version
+        if self._bridge_grid_layout == layout_version:
+            return
+        self._bridge_grid.clear()
+        for bridge_id in self.bridges.ids():
+            self._bridge_grid.insert(bridge_id, self._bridge_bounds(bridge_id))
+        self._bridge_grid_layout = layout_version
 
     def _handle_bridge_removal(self, point: Tuple[float, float]) -> None:
         """Xử lý việc xóa cầu khi double click."""
         closest_bridge = None
         min_distance = float('inf')
-        closest_index = -1
         
-        # Tìm cầu gần nhất với điểm click
-        for i, (start_anchor, end_anchor) in enumerate(self.bridges):
+        # Tìm cầu gần nhất với điểm click trong số các cầu lân cận (tra lưới không gian)
+        self._sync_bridge_grid()
+        for bridge_id in self._bridge_grid.query(point, self.bridge_pick_distance):
+            start_anchor, end_anchor = self.bridges.get(bridge_id)
             # Tính khoảng cách từ điểm click đến đường thẳng nối 2 anchor
             distance = self._point_to_line_distance(point, (start_anchor.x, start_anchor.y), (end_anchor.x, end_anchor.y))
             
-            if distance < min_distance and distance < 15:  # Chỉ xóa nếu click đủ gần (15 pixels)
+            if distance < min_distance and distance < self.bridge_pick_distance:
                 min_distance = distance
-                closest_bridge = (start_anchor, end_anchor)
-                closest_index = i
+                closest_bridge = bridge_id
         
-        # Xóa cầu nếu tìm thấy
+        # Xóa đúng cầu được chọn (kèm cạnh tương ứng của nó trong đồ thị)
         if closest_bridge is not None:
-            # Xóa khỏi danh sách cầu
-            del self.bridges[closest_index]
-            
-            # Xóa cạnh tương ứng khỏi đồ thị
-            start_node = self.REGION_TO_NODE_ID[closest_bridge[0].region]
-            end_node = self.REGION_TO_NODE_ID[closest_bridge[1].region]
-            
-            # Xóa một cạnh giữa 2 node (trong trường hợp có nhiều cạnh)
-            if self.graph.has_edge(start_node, end_node):
-                self.graph.remove_edge(start_node, end_node)
-            
-            # Cập nhật phân tích
-            self._analyze_graph()
+            start_anchor, end_anchor = self.bridges.get(closest_bridge)
+            self._execute(BridgeCommand(REMOVE, start_anchor.id, end_anchor.id))
     
     def _point_to_line_distance(self, point: Tuple[float, float], line_start: Tuple[float, float], line_end: Tuple[float, float]) -> float:
         """Tính khoảng cách từ một điểm đến một đoạn thẳng."""
@@ -383,108 +609,35 @@ class SubScreen:
         # Khoảng cách
         return ((px - closest_x) ** 2 + (py - closest_y) ** 2) ** 0.5
 
+    def _partner_table(self) -> PartnerTable:
+        """Bảng quy tắc nối đã biên dịch sẵn trong bản đồ (không phụ thuộc bố cục điểm neo)."""
+        return self.map_definition.partners
+
     def _is_valid_connection(self, start_anchor: BridgeAnchor, end_anchor: BridgeAnchor) -> bool:
-        """Kiểm tra xem có được phép kết nối giữa 2 anchor không."""
-        start_region = start_anchor.region
-        end_region = end_anchor.region
-        start_index = start_anchor.index
-        end_index = end_anchor.index
-        
-        # Quy tắc kết nối point-to-point:
-        
-        # 1. North <-> Kneiphof: theo danh sách từ user
-        if (start_region == "north" and end_region == "kneiphof") or \
-           (start_region == "kneiphof" and end_region == "north"):
-            # north_0->kneiphof_4, north_1->kneiphof_5, north_2->kneiphof_6, north_3->kneiphof_7
-            if start_region == "north":
-                if start_index < 4 and end_index >= 4 and end_index < 8:
-                    expected_end = start_index + 4  # 0->4, 1->5, 2->6, 3->7
-                    return end_index == expected_end
-                return False
-            else:  # start_region == "kneiphof"
-                if start_index >= 4 and start_index < 8 and end_index < 4:
-                    expected_end = start_index - 4  # 4->0, 5->1, 6->2, 7->3
-                    return end_index == expected_end
-                return False
-        
-        # 2. North <-> Lomse: theo danh sách từ user
-        elif (start_region == "north" and end_region == "lomse") or \
-             (start_region == "lomse" and end_region == "north"):
-            # north_4->lomse_4, north_5->lomse_5, north_6->lomse_6, north_7->lomse_7
-            if start_region == "north":
-                if start_index >= 4 and end_index >= 4 and end_index < 8:
-                    expected_end = start_index  # 4->4, 5->5, 6->6, 7->7
-                    return end_index == expected_end
-                return False
-            else:  # start_region == "lomse"
-                if start_index >= 4 and start_index < 8 and end_index >= 4:
-                    expected_end = start_index  # 4->4, 5->5, 6->6, 7->7
-                    return end_index == expected_end
-                return False
-        
-        # 3. South <-> Kneiphof: theo danh sách từ user
-        elif (start_region == "south" and end_region == "kneiphof") or \
-             (start_region == "kneiphof" and end_region == "south"):
-            # south_0->kneiphof_3, south_1->kneiphof_2, south_2->kneiphof_1, south_3->kneiphof_0
-            if start_region == "south":
-                if start_index < 4 and end_index < 4:
-                    expected_end = 3 - start_index  # 0->3, 1->2, 2->1, 3->0
-                    return end_index == expected_end
-                return False
-            else:  # start_region == "kneiphof"
-                if start_index < 4 and end_index < 4:
-                    expected_end = 3 - start_index  # 0->3, 1->2, 2->1, 3->0
-                    return end_index == expected_end
-                return False
-        
-        # 4. South <-> Lomse: theo danh sách từ user
-        elif (start_region == "south" and end_region == "lomse") or \
-             (start_region == "lomse" and end_region == "south"):
-            # south_4->lomse_3, south_5->lomse_2, south_6->lomse_1, south_7->lomse_0
-            if start_region == "south":
-                if start_index >= 4 and end_index < 4:
-                    expected_end = 7 - start_index  # 4->3, 5->2, 6->1, 7->0
-                    return end_index == expected_end
-                return False
-            else:  # start_region == "lomse"
-                if start_index < 4 and end_index >= 4:
-                    expected_end = 7 - start_index  # 0->7, 1->6, 2->5, 3->4
-                    return end_index == expected_end
-                return False
-        
-        # 5. Kneiphof <-> Lomse: 3 điểm giữa với nhau (index ngược chiều)
-        elif (start_region == "kneiphof" and end_region == "lomse") or \
-             (start_region == "lomse" and end_region == "kneiphof"):
-            # Kneiphof điểm 8-10 (giữa) <-> Lomse điểm 8-10 (giữa) nhưng ngược chiều
-            # Kneiphof_8 <-> Lomse_10, Kneiphof_9 <-> Lomse_9, Kneiphof_10 <-> Lomse_8
-            if start_region == "kneiphof":
-                if start_index >= 8 and end_index >= 8:
-                    # Index ngược: 8->10, 9->9, 10->8
-                    expected_end = 18 - start_index  # 8+10=18, vậy 8->10, 9->9, 10->8
-                    return end_index == expected_end
-                return False
-            else:  # start_region == "lomse"
-                if start_index >= 8 and end_index >= 8:
-                    # Index ngược: 8->10, 9->9, 10->8
-                    expected_end = 18 - start_index  # 8+10=18, vậy 8->10, 9->9, 10->8
-                    return end_index == expected_end
-                return False
-        
-        # Tất cả các kết nối khác không được phép
-        return False
+        """Kiểm tra xem có được phép kết nối giữa 2 anchor không (tra bảng đã biên dịch, O(1))."""
+        return self._partner_table().is_valid(start_anchor.id, end_anchor.id)
     
     def _highlight_valid_targets(self, selected_anchor: BridgeAnchor) -> None:
         """Highlight tất cả các điểm có thể kết nối với điểm được chọn."""
-        self.highlighted_anchors.clear()
-        
-        # Tìm tất cả các anchor có thể kết nối
-        for anchor in self.konigsberg_map.anchor_manager.anchors:
-            if anchor.region != selected_anchor.region:  # Chỉ xét các region khác
-                if self._is_valid_connection(selected_anchor, anchor):
-                    self.highlighted_anchors.append(anchor)
+        # Danh sách đối tác đã được tính sẵn trong bảng quy tắc
+        self.highlighted_ids = set(self._partner_table().partners_of(selected_anchor.id))
 
     def get_analysis_result(self) -> list[str]:
-        """Trả về kết quả phân tích để MainScreen có thể hiển thị."""
+        """Trả về kết quả phân tích để MainScreen có thể hiển thị (dựng lại nếu đã cũ).
+
+        Kết quả được ghi nhớ theo vector số cạnh, tham số ngắt dòng và trang đường đi; trạng thái đã gặp không cần tính lại.
+        """
+        if self._analysis_stale:
+            key = (self.bridges.count_key(), self._wrap_font, self._wrap_width, self.walk_page)
+            entry = self.analysis_memo.get(key)
+            if entry is None:
+                self._analyze_graph()
+                if not self.analysis_pending:  # chỉ ghi nhớ kết quả hoàn chỉnh
+                    self.analysis_memo.put(key, self.analysis_result, self.analysis_walk)
+            else:
+                self.analysis_result = list(entry.lines)
+                self.analysis_walk = None if entry.walk is None else list(entry.walk)
+            self._analysis_stale = False
         return self.analysis_result
 
 
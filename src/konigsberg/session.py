@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, NamedTuple, Tuple
+
+from .analysis import config_table
+from .analysis.bridge_store import pair_key
+from .maps import CompiledMap
+
+ADD = "add"
+REMOVE = "remove"
+
+SESSION_VERSION = 1
+
+Pair = Tuple[str, str]
+
+
+class BridgeCommand(NamedTuple):
+    """Một thao tác trên danh sách cầu, tham chiếu cầu bằng cặp ID điểm neo (ổn định qua các phiên)."""
+
+    op: str  # ADD hoặc REMOVE
+    start_id: str
+    end_id: str
+
+    def inverse(self) -> "BridgeCommand":
+        return BridgeCommand(REMOVE if self.op == ADD else ADD, self.start_id, self.end_id)
+
+
+class CommandHistory:
+    """Ngăn xếp undo/redo của các thao tác cầu; mọi thao tác đều O(1).
+
+    Thao tác mới xóa nhánh redo; ngăn undo giữ tối đa `limit` thao tác gần nhất.
+    """
+
+    def __init__(self, limit: int = 1000) -> None:
+        self._undo: Deque[BridgeCommand] = deque(maxlen=limit)
+        self._redo: List[BridgeCommand] = []
+
+    def push(self, command: BridgeCommand) -> None:
+        self._undo.append(command)
+        self._redo.clear()
+
+    def undo(self) -> BridgeCommand | None:
+        """Thao tác cần hoàn tác (chưa đảo chiều), hoặc None nếu không còn gì."""
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        self._redo.append(command)
+        return command
+
+    def redo(self) -> BridgeCommand | None:
+        """Thao tác cần làm lại, hoặc None nếu không còn gì."""
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        self._undo.append(command)
+        return command
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+
+# --- Snapshot ------------------------------------------------------------------------
+def encode_snapshot(pairs: Iterable[Pair], use_mask: bool) -> Dict[str, object]:
+    """Ảnh chụp danh sách cầu: mặt nạ bit trên 19 cầu hợp lệ (bản đồ Königsberg) hoặc danh sách cặp."""
+    pairs = [pair_key(*pair) for pair in pairs]
+    if use_mask:
+        bridge_bits = config_table.BRIDGE_BITS
+        if all(pair in bridge_bits for pair in pairs):
+            mask = 0
+            for pair in pairs:
+                mask |= 1 << bridge_bits[pair]
+            return {"mask": mask}
+    return {"pairs": [list(pair) for pair in pairs]}
+
+
+class SessionError(ValueError):
+    """Tệp phiên không dùng được cho bản đồ hiện tại (sai phiên bản hoặc khác bản đồ)."""
+
+
+def decode_snapshot(snapshot: Dict[str, object]) -> List[Pair]:
+    """Danh sách cặp điểm neo từ một ảnh chụp."""
+    if "mask" in snapshot:
+        mask = int(snapshot["mask"])
+        return [pair for bit, pair in enumerate(config_table.LEGAL_BRIDGES) if mask >> bit & 1]
+    return [pair_key(a, b) for a, b in snapshot.get("pairs", [])]
+
+
+def _record_pair(value: object) -> Pair | None:
+    """Cặp điểm neo của một bản ghi add/remove; None nếu bản ghi hỏng (không phải hai chuỗi)."""
+    if isinstance(value, list) and len(value) == 2 and all(isinstance(item, str) for item in value):
+        return pair_key(*value)
+    return None
+
+
+class SessionJournal:
+    """Nhật ký phiên dạng JSON Lines, chỉ ghi nối thêm.
+
+    Dòng đầu là tiêu đề phiên, tiếp theo là một ảnh chụp và các thao tác `add`/`remove`.
+    Mỗi thao tác được ghi một dòng rồi fsync, nên mất điện giữa chừng chỉ có thể làm hỏng
+    dòng cuối (bị bỏ qua khi đọc lại). Khi mở và khi nhật ký đủ dài, tệp được nén lại thành
+    một ảnh chụp duy nhất (ghi nguyên tử), nên khôi phục phiên chỉ là đọc vài dòng.
+    """
+
+    def __init__(self, path: str | Path, map_definition: CompiledMap, compact_every: int = 500) -> None:
+        self.path = Path(path)
+        self.map_name = map_definition.name
+        # Bản đồ Königsberg: ảnh chụp là mặt nạ 19 bit
+        self.use_mask = map_definition.partners.pairs() == frozenset(config_table.LEGAL_BRIDGES)
+        self.compact_every = compact_every
+        self._pairs: Dict[Pair, None] = {}  # trạng thái hiện tại (giữ thứ tự thêm vào)
+        self._ops_since_snapshot = 0
+        self._handle = None
+
+    def open(self) -> List[Pair]:
+        """Đọc lại nhật ký (nếu có), nén thành ảnh chụp và mở để ghi tiếp; trả về các cặp cần khôi phục."""
+        self._pairs = dict.fromkeys(self._replay())
+        self.compact()
+        return list(self._pairs)
+
+    def _replay(self) -> List[Pair]:
+        if not self.path.exists():
+            return []
+        pairs: Dict[Pair, None] = {}
+        with open(self.path, encoding="utf-8") as handle:
+            for number, line in enumerate(handle):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # dòng cuối bị cắt dở khi ghi
+                if not isinstance(record, dict):
+                    continue  # dòng hỏng hoặc bị sửa tay: JSON hợp lệ nhưng không phải bản ghi
+                if number == 0:
+                    if record.get("session") != SESSION_VERSION or record.get("map") != self.map_name:
+                        raise SessionError(f"Tệp phiên không dùng cho bản đồ này: {self.path}")
+                elif "snapshot" in record:
+                    try:
+                        pairs = dict.fromkeys(decode_snapshot(record["snapshot"]))
+                    except (TypeError, ValueError, AttributeError):
+                        continue  # ảnh chụp hỏng: bỏ qua như các dòng hỏng khác
+                elif ADD in record:
+                    pair = _record_pair(record[ADD])
+                    if pair is not None:
+                        pairs[pair] = None
+                elif REMOVE in record:
+                    pair = _record_pair(record[REMOVE])
+                    if pair is not None:
+                        pairs.pop(pair, None)
+        return list(pairs)
+
+    def record(self, command: BridgeCommand) -> None:
+        """Ghi nối một thao tác vào nhật ký (fsync ngay)."""
+        key = pair_key(command.start_id, command.end_id)
+        if command.op == ADD:
+            self._pairs[key] = None
+        else:
+            self._pairs.pop(key, None)
+        self._ops_since_snapshot += 1
+        if self._ops_since_snapshot >= self.compact_every:
+            self.compact()
+            return
+        self._write({command.op: list(key)})
+
+    def compact(self) -> None:
+        """Thay nhật ký bằng tiêu đề + một ảnh chụp của trạng thái hiện tại (ghi nguyên tử)."""
+        from .paths import atomic_write_bytes
+
+        self.close()
+        lines = [
+            {"session": SESSION_VERSION, "map": self.map_name},
+            {"snapshot": encode_snapshot(self._pairs, self.use_mask)},
+        ]
+        data = "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines)
+        atomic_write_bytes(self.path, data.encode("utf-8"))
+        self._ops_since_snapshot = 0
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    def _write(self, record: Dict[str, object]) -> None:
+        assert self._handle is not None, "Nhật ký phiên chưa được mở"
+        self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
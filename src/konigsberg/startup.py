@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+import sys
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import ContextManager, Dict, Iterator, List, TextIO
+
+# Đặt biến môi trường này (khác rỗng và khác "0") để bật đo khởi động mà không cần cờ dòng lệnh
+ENV_VAR = "KONIGSBERG_STARTUP_TRACE"
+
+PHASES = ("import", "init", "font", "first_draw")
+
+
+class StartupTrace:
+    """Đo thời gian từ lúc nạp gói tới khi frame đầu tiên được đẩy lên màn hình.
+
+    Mỗi pha tính thời gian riêng: thời gian của pha lồng bên trong (ví dụ nạp font khi đang
+    khởi tạo màn hình) được trừ khỏi pha ngoài, nên tổng các pha cộng phần "khác" bằng tổng
+    thời gian khởi động. Sau frame đầu tiên, `phase()` không còn đo gì nữa.
+    """
+
+    def __init__(self) -> None:
+        self.origin = perf_counter()
+        self.enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+        self.durations: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.total: float | None = None
+        # Ngăn xếp [tên pha, thời điểm bắt đầu, thời gian của các pha con]
+        self._stack: List[list] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.total is not None
+
+    def phase(self, name: str) -> ContextManager[None]:
+        if self.finished:
+            return nullcontext()
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        entry = [name, perf_counter(), 0.0]
+        self._stack.append(entry)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = perf_counter() - entry[1]
+            self.durations[name] = self.durations.get(name, 0.0) + elapsed - entry[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def finish(self, stream: TextIO | None = None) -> None:
+        """Chốt số liệu sau frame đầu tiên và in báo cáo (nếu được bật); chỉ có tác dụng lần đầu."""
+        if self.finished:
+            return
+        self.total = perf_counter() - self.origin
+        if self.enabled:
+            print(self.report(), file=stream or sys.stderr)
+
+    def report(self) -> str:
+        total = self.total if self.total is not None else perf_counter() - self.origin
+        rows = list(self.durations.items())
+        rows.append(("khác", total - sum(self.durations.values())))
+        lines = [f"Khởi động tới frame đầu tiên: {total * 1000:.1f} ms"]
+        lines.extend(f"  {name:<11}{seconds * 1000:8.1f} ms" for name, seconds in rows)
+        return "\n".join(lines)
+
+
+# Một bộ đo cho cả tiến trình; mốc thời gian là lúc module này được nạp lần đầu
+startup_trace = StartupTrace()